@@ -11,6 +11,7 @@ __docformat__ = "restructuredtext en"
 import logging
 
 from django.core.exceptions import ObjectDoesNotExist, MultipleObjectsReturned
+from django.utils import translation
 from django.utils.translation import gettext, gettext_lazy as _
 
 from . import ChoiceManagerImplementation
@@ -55,6 +56,8 @@ class BaseChoiceManager(InspectChoice, ChoiceManagerImplementation):
         super(BaseChoiceManager, self).__init__()
         self.containers = []
         self.container_map = {}
+        self._indexes = {}
+        self._choices = {}
 
         if not self.VALUES:
             raise TypeError(_("Must set the '{}' object to valid choices "
@@ -68,7 +71,8 @@ class BaseChoiceManager(InspectChoice, ChoiceManagerImplementation):
             raise TypeError(_("Must provide fields to populate for your "
                               "choices."))
 
-    @InspectChoice.set_model
+        self._fields = frozenset(self.FIELD_LIST) | {'pk'}
+
     def model_objects(self):
         """
         This method creates and returns the choice objects the first time
@@ -96,37 +100,83 @@ class BaseChoiceManager(InspectChoice, ChoiceManagerImplementation):
 
     all = model_objects
 
-    @InspectChoice.set_model
     def get(self, **kwargs):
-        fields = self.FIELD_LIST + ['pk']
-        assert kwargs, "Cannot execute a query with no arguments."
-        valid = all([f in fields for f in kwargs.keys()])
-        assert valid, "Invalid field name, not all '{}' are in '{}'.".format(
-            list(kwargs.keys()), fields)
-        result = []
-
-        for obj in self.model_objects():
-            found = all([
-                getattr(obj, field) == (
-                    int(value)
-                    if isinstance(value, str) and value.isdigit() else value
-                    )
-                for field, value in kwargs.items()])
-            if found: result.append(obj)
+        """
+        Get the one choice object matching all the keyword arguments.
 
+        :rtype: A non-django model ``CHOICE`` object.
+        :raises ObjectDoesNotExist: If no object matches.
+        :raises MultipleObjectsReturned: If more than one object matches.
+        """
+        assert kwargs, "Cannot execute a query with no arguments."
+        result = self.filter(**kwargs)
         num = len(result)
 
         if num == 0:
             raise ObjectDoesNotExist(
                 "{} matching query does not exist.".format(
                     self.model.__name__))
-        elif num > 1: # pragma: no cover
+        elif num > 1:
             raise MultipleObjectsReturned(
                 "get() returned more than one {} -- it returned {}!".format(
                     self.model.__name__, num))
 
         return result[0]
 
+    def filter(self, **kwargs):
+        """
+        Get the choice objects matching all the keyword arguments. Each
+        field is looked up in a hash index built the first time the field
+        is used.
+
+        :rtype: A list of non-django model ``CHOICE`` objects.
+        """
+        assert self._fields.issuperset(kwargs), (
+            "Invalid field name, not all '{}' are in '{}'.".format(
+                list(kwargs.keys()), list(self.FIELD_LIST) + ['pk']))
+
+        if not kwargs:
+            return list(self.model_objects())
+
+        result = None
+
+        for field, value in kwargs.items():
+            if isinstance(value, str) and value.isdigit():
+                value = int(value)
+
+            found = self._get_index(field).get(value, ())
+
+            if result is None:
+                result = found
+            else:
+                found = set(map(id, found))
+                result = [obj for obj in result if id(obj) in found]
+
+            if not result:
+                break
+
+        return list(result)
+
+    def _get_index(self, field):
+        """
+        Get the index of a field, building it if needed.
+
+        :param field: The field name.
+        :type field: str
+        :rtype: A dict of ``{<value>: [<object>, ...], ...}``.
+        """
+        index = self._indexes.get(field)
+
+        if index is None:
+            index = {}
+
+            for obj in self.model_objects():
+                index.setdefault(getattr(obj, field), []).append(obj)
+
+            self._indexes[field] = index
+
+        return index
+
     def get_value_by_pk(self, pk, field):
         """
         Calls model_objects() to be sure the choice objects are created,
@@ -174,18 +224,26 @@ class BaseChoiceManager(InspectChoice, ChoiceManagerImplementation):
         :param sort: Defaults ro ``True`` sorting the results, a ``False``
                      will turn off sorting.
         :type sort: bool
-        :rtype: A list of tuples suitable for use in HTML select option
-                tags.
+        :rtype: A tuple of tuples suitable for use in HTML select option
+                tags. The ``VALUES`` never change so the result is cached
+                for each language.
         """
-        choices = [(obj.pk, gettext(getattr(obj, field)))
-                   for obj in self.model_objects()]
+        key = (field, translation.get_language(), bool(comment), bool(sort))
+        choices = self._choices.get(key)
+
+        if choices is None:
+            choices = [(obj.pk, gettext(getattr(obj, field)))
+                       for obj in self.model_objects()]
+
+            if sort:
+                choices.sort(key=lambda x: x[1])
 
-        if sort:
-            choices.sort(key=lambda x: x[1])
+            if comment:
+                choices.insert(
+                    0, (0, _("Please choose a {}").format(
+                        self.model.__name__)))
 
-        if comment:
-            choices.insert(
-                0, (0, _("Please choose a {}").format(self.model.__name__)))
+            choices = self._choices[key] = tuple(choices)
 
         return choices
 
@@ -6,7 +6,9 @@
 #          framework from https://github.com/cnobile2012/dcolumn.
 #
 
+from django.core.exceptions import ObjectDoesNotExist, MultipleObjectsReturned
 from django.test import TestCase
+from django.utils import translation
 
 from dcolumn.common.choice_mixins import BaseChoiceManager
 
@@ -46,6 +48,25 @@ class TestMultipleFieldChoice(object):
     objects = TestMultipleFieldChoiceManager()
 
 
+#
+# TestDuplicateFieldChoice
+#
+class TestDuplicateFieldChoiceManager(BaseChoiceManager):
+    VALUES = (('Arduino', 'Uno'), ('Arduino', 'Mega2560'),
+              ('Raspberry Pi', 'B+'),)
+    FIELD_LIST = ('pk', 'name', 'version',)
+
+    def __init__(self):
+        super(TestDuplicateFieldChoiceManager, self).__init__()
+
+class TestDuplicateFieldChoice(object):
+    pk = 0
+    name = ''
+    version = ''
+
+    objects = TestDuplicateFieldChoiceManager()
+
+
 class TestChoiceMixins(TestCase):
 
     def __init__(self, name):
@@ -104,6 +125,65 @@ class TestChoiceMixins(TestCase):
         msg = "Should be 2 objects, found {}".format(len(values))
         self.assertEqual(len(values), 2, msg)
 
+    def test_model(self):
+        """
+        Test that the manager is bound to its choice class when it is
+        assigned and that the bound model is used.
+        """
+        #self.skipTest("Temporarily skipped")
+        manager = TestSingleFieldChoice.objects
+        msg = "model: {}".format(manager.model)
+        self.assertTrue(manager.model is TestSingleFieldChoice, msg)
+        self.assertTrue(isinstance(manager.get(pk=1), TestSingleFieldChoice),
+                        msg)
+        manager = TestMultipleFieldChoice.objects
+        msg = "model: {}".format(manager.model)
+        self.assertTrue(manager.model is TestMultipleFieldChoice, msg)
+
+    def test_get(self):
+        """
+        Test get.
+        """
+        #self.skipTest("Temporarily skipped")
+        manager = TestDuplicateFieldChoice.objects
+        obj = manager.get(name='Raspberry Pi')
+        msg = "pk: {}, name: {}".format(obj.pk, obj.name)
+        self.assertEqual(obj.pk, 3, msg)
+        obj = manager.get(pk='2')
+        msg = "pk: {}, name: {}".format(obj.pk, obj.name)
+        self.assertEqual(obj.version, 'Mega2560', msg)
+        obj = manager.get(name='Arduino', version='Uno')
+        msg = "pk: {}, name: {}".format(obj.pk, obj.name)
+        self.assertEqual(obj.pk, 1, msg)
+        # Test that duplicates raise MultipleObjectsReturned.
+        with self.assertRaises(MultipleObjectsReturned) as cm:
+            manager.get(name='Arduino')
+        # Test that a missing value raises ObjectDoesNotExist.
+        with self.assertRaises(ObjectDoesNotExist) as cm:
+            manager.get(name='Arduino', version='B+')
+        # Test that an invalid field raises an AssertionError.
+        with self.assertRaises(AssertionError) as cm:
+            manager.get(bad_field='Arduino')
+
+    def test_filter(self):
+        """
+        Test filter.
+        """
+        #self.skipTest("Temporarily skipped")
+        manager = TestDuplicateFieldChoice.objects
+        found = [obj.pk for obj in manager.filter(name='Arduino')]
+        msg = "found: {}".format(found)
+        self.assertEqual(found, [1, 2], msg)
+        found = [obj.pk for obj in manager.filter(name='Arduino', pk=2)]
+        msg = "found: {}".format(found)
+        self.assertEqual(found, [2], msg)
+        found = manager.filter(name='Beagle Bone')
+        msg = "found: {}".format(found)
+        self.assertEqual(found, [], msg)
+        found = manager.filter()
+        msg = "found: {}".format(found)
+        self.assertEqual(len(found), 3, msg)
+
     def test_get_value_by_pk(self):
         """
         Test get_value_by_pk.
@@ -157,3 +237,14 @@ class TestChoiceMixins(TestCase):
         item = 'Please choose a TestSingleFieldChoice'
         msg = "Comment {}, found {}".format(item, found_values.get(0))
         self.assertEqual(item, found_values.get(0), msg)
+        # Test that the result is cached for each language.
+        choices = tsfc.objects.get_choices('name')
+        msg = "choices: {}".format(choices)
+        self.assertTrue(isinstance(choices, tuple), msg)
+        self.assertTrue(tsfc.objects.get_choices('name') is choices, msg)
+
+        with translation.override('de'):
+            found_values = tsfc.objects.get_choices('name')
+
+        msg = "choices: {}, found: {}".format(choices, found_values)
+        self.assertFalse(found_values is choices, msg)
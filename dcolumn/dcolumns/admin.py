@@ -12,6 +12,7 @@ from django.utils.translation import gettext_lazy as _
 
 from dcolumn.common.admin_mixins import UserAdminMixin
 
+from .codecs import codec_registry
 from .models import DynamicColumn, ColumnCollection, KeyValue
 from .forms import (
     DynamicColumnAdminForm, ColumnCollectionAdminForm, KeyValueAdminForm)
@@ -67,6 +68,23 @@ class ColumnCollectionAdmin(UserAdminMixin):
 #
 # DynamicColumn
 #
+class ValueTypeListFilter(admin.SimpleListFilter):
+    """
+    Filters on the registered value types, including custom ones.
+    """
+    title = _("Value Type")
+    parameter_name = 'value_type'
+
+    def lookups(self, request, model_admin):
+        return codec_registry.choices
+
+    def queryset(self, request, queryset):
+        if self.value() is not None:
+            queryset = queryset.filter(value_type=self.value())
+
+        return queryset
+
+
 @admin.register(DynamicColumn)
 class DynamicColumnAdmin(UserAdminMixin):
     """
@@ -82,11 +100,13 @@ class DynamicColumnAdmin(UserAdminMixin):
                                   'updated',)}),
         )
     readonly_fields = ('creator', 'slug', 'updater', 'created', 'updated',)
-    list_display = ('name', 'collection_producer', 'slug', 'value_type',
+    list_display = ('name', 'collection_producer', 'slug',
+                    'value_type_producer',
                     'relation_producer', 'store_relation', 'required',
                     'location', 'order', 'updated', 'active',)
     list_editable = ('location', 'order', 'active',)
     search_fields = ('slug', 'location',)
-    list_filter = ('column_collection', 'value_type', 'store_relation')
+    list_filter = ('column_collection', ValueTypeListFilter,
+                   'store_relation',)
     ordering = ('column_collection__name', 'location', 'order', 'name',)
     form = DynamicColumnAdminForm
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+#
+# dcolumn/dcolumns/apps.py
+#
+
+"""
+Dynamic Column application configuration.
+"""
+__docformat__ = "restructuredtext en"
+
+from django.apps import AppConfig
+from django.core.signals import request_started
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.utils.translation import gettext_lazy as _
+
+
+class DynamicColumnsConfig(AppConfig):
+    name = 'dcolumn.dcolumns'
+    label = 'dcolumns'
+    verbose_name = _("Dynamic Columns")
+
+    def ready(self):
+        """
+        Freeze the choice and CSS container registry, then connect the
+        signals that keep the schema cache current, in this process and in
+        all the others, and the signals that keep the choice options, the
+        cached choices lists and the key value cache current.
+        """
+        from django.db.models import Model
+        from .models import (
+            DynamicColumn, ColumnCollection, CollectionBase, KeyValue)
+        from .manager import dcolumn_manager
+        from .schema import schema_cache
+        from .choice_index import choice_index_cache
+        from .kv_cache import kv_cache
+        from .signals import key_values_changed
+
+        dcolumn_manager.freeze()
+
+        for model in (DynamicColumn, ColumnCollection):
+            post_save.connect(schema_cache.invalidate, sender=model,
+                              dispatch_uid='dcolumns_schema_save')
+            post_delete.connect(schema_cache.invalidate, sender=model,
+                                dispatch_uid='dcolumns_schema_delete')
+
+        m2m_changed.connect(schema_cache.invalidate,
+                            sender=ColumnCollection.dynamic_column.through,
+                            dispatch_uid='dcolumns_schema_m2m')
+        request_started.connect(schema_cache.revalidate,
+                                dispatch_uid='dcolumns_schema_revalidate')
+        post_save.connect(kv_cache.key_value_changed, sender=KeyValue,
+                          dispatch_uid='dcolumns_kv_save')
+        post_delete.connect(kv_cache.key_value_changed, sender=KeyValue,
+                            dispatch_uid='dcolumns_kv_delete')
+        key_values_changed.connect(kv_cache.key_values_changed,
+                                   dispatch_uid='dcolumns_kv_changed')
+
+        # The choice options of Django models and the get_choices lists of
+        # the CollectionBase models.
+        choice_models = {model for model, field
+                         in dcolumn_manager.choice_map.values()
+                         if issubclass(model, Model)}
+        choice_models.update(model for model in self.apps.get_models()
+                             if issubclass(model, CollectionBase))
+
+        for model in choice_models:
+            post_save.connect(choice_index_cache.invalidate, sender=model,
+                              dispatch_uid='dcolumns_choice_save')
+            post_delete.connect(choice_index_cache.invalidate, sender=model,
+                                dispatch_uid='dcolumns_choice_delete')
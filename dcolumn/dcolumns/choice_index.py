@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+#
+# dcolumn/dcolumns/choice_index.py
+#
+
+"""
+An in-process cache of the ``CHOICE`` options with a prefix index over
+their labels, used to fill select tags and to answer autocomplete
+requests without loading the choice tables on every request. The lists
+returned by ``CollectionBaseManager.get_choices`` are kept here too.
+
+Each Django model has a generation number in the Django cache that is
+bumped when one of its records is saved or deleted, so the entries built
+by every process are rebuilt on their next use.
+"""
+__docformat__ = "restructuredtext en"
+
+import time
+import hashlib
+import logging
+import threading
+from bisect import bisect_left
+
+from django.core.cache import caches
+from django.db import models, transaction
+from django.db.models import Count, Max
+
+from .manager import dcolumn_manager
+
+log = logging.getLogger('dcolumns.dcolumns.choice_index')
+
+
+class ChoiceIndex(object):
+    """
+    The options of one choice model and field. ``options`` is the list of
+    ``(pk, label)`` tuples in the model's order, the index keeps the same
+    tuples sorted by their lowercase label.
+    """
+
+    def __init__(self, options, state=None):
+        """
+        Constructor.
+
+        :param options: A list of ``(pk, label)`` tuples.
+        :type options: list
+        :param state: The ``ChoiceIndexCache.get_state`` of the model when
+                      the options were loaded.
+        :type state: str or None
+        """
+        self.options = tuple(options)
+        self.state = state
+        entries = sorted(((str(label).lower(), pk, label)
+                          for pk, label in self.options),
+                         key=lambda item: item[:1])
+        self._keys = [key for key, pk, label in entries]
+        self._entries = [(pk, label) for key, pk, label in entries]
+        self._labels = dict(self.options)
+        self._pks = {}
+
+        for pk, label in self.options:
+            self._pks.setdefault(label, pk)
+
+    def __len__(self):
+        return len(self.options)
+
+    def search(self, query='', limit=20, cursor=None):
+        """
+        Find the options whose label starts with the query, case is
+        ignored.
+
+        :param query: The label prefix to search for.
+        :type query: str
+        :param limit: The maximum number of options to return, nothing is
+                      returned if less than one.
+        :type limit: int
+        :param cursor: The cursor returned by a previous search with the
+                       same query.
+        :type cursor: int or None
+        :rtype: A tuple of the list of ``(pk, label)`` tuples and the
+                cursor for the next page or ``None`` if this is the last
+                page.
+        """
+        if limit < 1:
+            return [], None
+
+        query = query.strip().lower()
+        start = bisect_left(self._keys, query)
+
+        if cursor is not None:
+            start = max(start, cursor)
+
+        results = []
+        pos = start
+
+        while pos < len(self._keys) and self._keys[pos].startswith(query):
+            if len(results) == limit:
+                return results, pos
+
+            results.append(self._entries[pos])
+            pos += 1
+
+        return results, None
+
+    def get_label(self, pk, default=''):
+        """
+        Get the label for the `pk`.
+
+        :param pk: The `pk` of the choice.
+        :type pk: int
+        :param default: Returned if the `pk` is not found.
+        :rtype: The label.
+        """
+        return self._labels.get(pk, default)
+
+    def get_pk(self, label, default=0):
+        """
+        Get the `pk` for a label, used with stored relations.
+
+        :param label: The label of the choice.
+        :type label: str
+        :param default: Returned if the label is not found.
+        :rtype: The `pk`.
+        """
+        return self._pks.get(label, default)
+
+
+class ChoiceIndexCache(object):
+    """
+    Holds a ``ChoiceIndex`` for each choice model and field, and the
+    ``get_choices`` lists of the Django models. An entry is rebuilt after
+    ``TIMEOUT`` seconds or when the generation of its model changes.
+    """
+    TIMEOUT = 300
+    PREFIX = 'dcolumns:choices'
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        """
+        Drop all the indexes.
+        """
+        with self._lock:
+            self._indexes = {}
+            self._choices = {}
+            self._states = {}
+
+    def get_index(self, model, field, state=None):
+        """
+        Get the index of a choice model, building it if needed.
+
+        :param model: A Django model or a pseudo model class.
+        :type model: class
+        :param field: The field used as the label.
+        :type field: str
+        :param state: If given the index is rebuilt when it was built with
+                      a different ``get_state``.
+        :type state: str or None
+        :rtype: A ``ChoiceIndex`` object.
+        """
+        key = (model, field)
+        generation = self._get_generation(model)
+        index = self._get_entry(self._indexes, key, generation)
+
+        if index is None or (state is not None and index.state != state):
+            index = ChoiceIndex(self._load_options(model, field), state)
+            log.debug("Built choice index for %s.%s with %s options.",
+                      model.__name__, field, len(index))
+            self._set_entry(self._indexes, key, index, generation)
+
+        return index
+
+    def get_choices(self, model, key, func):
+        """
+        Get a cached choices list of a model, building it if needed.
+
+        :param model: The Django model the choices are taken from.
+        :type model: class
+        :param key: A tuple of the arguments that change the list.
+        :type key: tuple
+        :param func: Called with no arguments to build the list.
+        :type func: callable
+        :rtype: A ``tuple`` of ``(pk, label)`` tuples.
+        """
+        key = (model,) + key
+        generation = self._get_generation(model)
+        choices = self._get_entry(self._choices, key, generation)
+
+        if choices is None:
+            choices = tuple(func())
+            self._set_entry(self._choices, key, choices, generation)
+
+        return choices
+
+    def get_state(self, model, field):
+        """
+        Get a string that changes when the records of a Django model
+        change, used in ETags. It is made from the record count and the
+        latest ``updated`` time, or from the generation of the model if it
+        has no ``updated`` field. The labels are then hashed once for each
+        generation, so the state also changes when the records are changed
+        without the model signals.
+
+        :param model: A Django model or a pseudo model class.
+        :type model: class
+        :param field: The field used as the label.
+        :type field: str
+        :rtype: The state or ``None`` for a pseudo model since its choices
+                only change with the code.
+        """
+        if not issubclass(model, models.Model):
+            return None
+
+        names = [f.attname for f in model._meta.concrete_fields]
+
+        if 'updated' in names:
+            values = model.objects.aggregate(
+                count=Count('pk'), updated=Max('updated'))
+            state = "{}:{}".format(values['count'], values['updated'])
+        else:
+            key = (model, field)
+            generation = self._get_generation(model)
+            state = self._get_entry(self._states, key, generation)
+
+            if state is None:
+                options = self._load_options(model, field)
+                state = "{}:{}".format(generation, hashlib.md5(
+                    repr(options).encode('utf-8')).hexdigest())
+                self._set_entry(self._states, key, state, generation)
+
+        return state
+
+    def _get_entry(self, cache, key, generation):
+        value, expires, entry_generation = cache.get(key, (None, 0, None))
+
+        if expires < time.monotonic() or entry_generation != generation:
+            value = None
+
+        return value
+
+    def _set_entry(self, cache, key, value, generation):
+        with self._lock:
+            cache[key] = (value, time.monotonic() + self.TIMEOUT, generation)
+
+    def _load_options(self, model, field):
+        records = model.objects.model_objects()
+
+        if issubclass(model, models.Model):
+            names = [f.attname for f in model._meta.concrete_fields]
+
+            # Only get the two columns needed for the labels.
+            if field in names and hasattr(records, 'values_list'):
+                return list(records.values_list('pk', field))
+
+        return [(r.pk, getattr(r, field)) for r in records]
+
+    def invalidate(self, sender, **kwargs):
+        """
+        Signal receiver that drops the indexes and choices of the sender
+        model in this process and bumps its generation for all the others.
+        This is done again when the transaction commits so a process that
+        read the old records before the commit cannot keep them.
+        """
+        with self._lock:
+            for cache in (self._indexes, self._choices, self._states):
+                for key in [key for key in cache if key[0] is sender]:
+                    del cache[key]
+
+        self._bump_generation(sender)
+        transaction.on_commit(lambda: self._bump_generation(sender))
+
+    def _get_generation_key(self, model):
+        return "{}:gen:{}".format(self.PREFIX, model._meta.label_lower)
+
+    def _get_generation(self, model):
+        # The pseudo model choices only change with the code.
+        if not issubclass(model, models.Model):
+            return None
+
+        cache = caches[dcolumn_manager.cache_alias]
+        key = self._get_generation_key(model)
+        generation = cache.get(key)
+
+        if generation is None:
+            # Seeded with the time so a lost key never brings back an old
+            # generation.
+            cache.add(key, int(time.time() * 1000), None)
+            generation = cache.get(key)
+
+        return generation
+
+    def _bump_generation(self, model):
+        cache = caches[dcolumn_manager.cache_alias]
+        key = self._get_generation_key(model)
+
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, int(time.time() * 1000), None)
+
+
+choice_index_cache = ChoiceIndexCache()
@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+#
+# dcolumn/dcolumns/codecs.py
+#
+
+"""
+The codecs that convert the text stored in a ``KeyValue`` to and from the
+type of its ``DynamicColumn``. A codec is registered for each value type
+in ``codec_registry``, custom value types can be added without changing
+``CollectionBase``.
+
+Example::
+
+  from dcolumn.dcolumns.codecs import codec_registry, ValueCodec
+
+  class ColorCodec(ValueCodec):
+
+      def encode(self, value):
+          if not (isinstance(value, str) and value.startswith('#')):
+              raise ValueError("Not a color.")
+
+          return value
+
+  codec_registry.register(100, ColorCodec(), "Color")
+"""
+__docformat__ = "restructuredtext en"
+
+import logging
+import datetime
+from collections import OrderedDict
+from dateutil import parser
+
+from django.utils.translation import gettext_lazy as _
+
+log = logging.getLogger('dcolumns.dcolumns.codecs')
+
+
+def parse_datetime(value):
+    """
+    Parse a date time string. ISO 8601 strings are parsed with the fast
+    ``datetime.fromisoformat``, anything else with ``dateutil``.
+
+    :param value: The date time string.
+    :type value: str
+    :rtype: A ``datetime.datetime`` object.
+    :raises ValueError: If the string could not be parsed.
+    """
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        pass
+
+    try:
+        return parser.parse(value)
+    except OverflowError as e:
+        raise ValueError(str(e))
+
+
+#
+# Codecs
+#
+class ValueCodec(object):
+    """
+    The base codec, it stores and returns strings. Subclasses override
+    ``encode`` and ``decode``.
+    """
+
+    def encode(self, value):
+        """
+        Convert a Python value to the text stored in a ``KeyValue``.
+
+        :param value: The value to convert.
+        :rtype: str
+        :raises ValueError: If the value is not valid for this type.
+        """
+        if not isinstance(value, str):
+            raise ValueError("Must be a string.")
+
+        return value
+
+    def decode(self, value):
+        """
+        Convert the text stored in a ``KeyValue`` to a Python value.
+
+        :param value: The stored text, never empty.
+        :type value: str
+        :rtype: The converted value.
+        :raises ValueError: If the text is not valid for this type.
+        """
+        return value
+
+    def decode_many(self, values):
+        """
+        Convert many stored values, for example one column of an export.
+        Each distinct value is decoded once.
+
+        :param values: The stored texts.
+        :type values: iterable
+        :rtype: A ``list`` of the converted values, ``None`` for the empty
+                ones.
+        :raises ValueError: If a text is not valid for this type.
+        """
+        decode = self.decode
+        decoded = {}
+        result = []
+
+        for value in values:
+            if value in (None, ''):
+                result.append(None)
+                continue
+
+            try:
+                result.append(decoded[value])
+            except KeyError:
+                decoded[value] = decode(value)
+                result.append(decoded[value])
+
+        return result
+
+
+class BooleanCodec(ValueCodec):
+    """
+    Booleans are stored as numbers or as a word, they are returned as they
+    were stored, ``0`` or ``1`` for numbers, ``True`` or ``False`` for
+    words.
+    """
+    # Some of these values can be a language other than English.
+    YES = _("yes")
+    NO = _("no")
+    YES_NO = (YES, NO, "yes", "no")
+    TRUE = _("true")
+    FALSE = _("false")
+    TRUE_FALSE = (TRUE, FALSE, "true", "false")
+
+    def encode(self, value):
+        if isinstance(value, bool):
+            result = str(value)
+        elif isinstance(value, int):
+            result = str(0 if value == 0 else 1)
+        elif isinstance(value, str):
+            if (value.lower() in self.TRUE_FALSE or
+                value.lower() in self.YES_NO):
+                result = value
+            elif value.isdigit():
+                result = str(0 if int(value) == 0 else 1)
+            else:
+                raise ValueError("Not a boolean.")
+        else:
+            raise ValueError("Not a boolean.")
+
+        return result
+
+    def decode(self, value):
+        lower = value.lower()
+
+        if value.isdigit():
+            result = 0 if int(value) == 0 else 1
+        elif lower in self.TRUE_FALSE:
+            result = lower in (self.TRUE, 'true')
+        elif lower in self.YES_NO:
+            result = lower in (self.YES, 'yes')
+        else:
+            raise ValueError("Not a boolean.")
+
+        return result
+
+
+class ChoiceCodec(ValueCodec):
+    """
+    The `pk` of a choice or the stored value of a relation. The choice
+    objects are resolved by ``CollectionBase``.
+    """
+
+    def encode(self, value):
+        if isinstance(value, str):
+            if not (value.isdigit() or value == ''):
+                raise ValueError("Not a choice pk.")
+
+            result = value
+        elif isinstance(value, int):
+            result = str(value)
+        else:
+            raise ValueError("Not a choice pk.")
+
+        return result
+
+    def decode(self, value):
+        return int(value) if value.isdigit() else value
+
+
+class DateTimeCodec(ValueCodec):
+    """
+    Date times are stored as given or in ISO 8601 format.
+    """
+
+    def encode(self, value):
+        if isinstance(value, (datetime.time, datetime.date,
+                              datetime.datetime)):
+            result = value.isoformat()
+        elif isinstance(value, str):
+            self.decode(value)
+            result = value
+        else:
+            raise ValueError("Not a date or time.")
+
+        return result
+
+    def decode(self, value):
+        return parse_datetime(value)
+
+
+class DateCodec(DateTimeCodec):
+
+    def decode(self, value):
+        try:
+            return datetime.date.fromisoformat(value)
+        except ValueError:
+            return parse_datetime(value).date()
+
+
+class TimeCodec(DateTimeCodec):
+
+    def decode(self, value):
+        try:
+            return datetime.time.fromisoformat(value)
+        except ValueError:
+            return parse_datetime(value).timetz()
+
+
+def _unsigned(value):
+    # Numbers and floats can be negative, counters can be decremented
+    # below zero.
+    return value[1:] if value.startswith('-') else value
+
+
+class FloatCodec(ValueCodec):
+
+    def encode(self, value):
+        if isinstance(value, float):
+            result = str(value)
+        elif isinstance(value, int):
+            result = str(float(value))
+        elif isinstance(value, str):
+            result = str(self.decode(value))
+        else:
+            raise ValueError("Not a float.")
+
+        return result
+
+    def decode(self, value):
+        if not _unsigned(value).replace('.', '').isdigit():
+            raise ValueError("Not a float.")
+
+        return float(value)
+
+
+class NumberCodec(ValueCodec):
+
+    def encode(self, value):
+        if isinstance(value, int):
+            result = str(value)
+        elif isinstance(value, str):
+            self.decode(value)
+            result = value
+        else:
+            raise ValueError("Not a number.")
+
+        return result
+
+    def decode(self, value):
+        if not _unsigned(value).isdigit():
+            raise ValueError("Not a number.")
+
+        return int(value)
+
+
+#
+# CodecRegistry
+#
+class CodecRegistry(object):
+    """
+    The codecs keyed by the ``DynamicColumn.value_type`` they convert.
+    """
+
+    def __init__(self):
+        self._codecs = OrderedDict()
+
+    def __contains__(self, value_type):
+        return value_type in self._codecs
+
+    def register(self, value_type, codec, label):
+        """
+        Register a codec for a value type. A codec registered for an
+        existing value type replaces it.
+
+        :param value_type: The number stored in ``DynamicColumn.value_type``.
+        :type value_type: int
+        :param codec: The codec.
+        :type codec: ``ValueCodec`` object
+        :param label: The name of the value type shown to users.
+        :type label: str
+        :raises TypeError: If the codec is not a ``ValueCodec``.
+        """
+        if not isinstance(codec, ValueCodec):
+            msg = "The codec '{}' must be a ValueCodec.".format(codec)
+            log.error(msg)
+            raise TypeError(msg)
+
+        self._codecs[value_type] = (codec, label)
+
+    def unregister(self, value_type):
+        """
+        Remove the codec of a value type.
+
+        :param value_type: The number stored in ``DynamicColumn.value_type``.
+        :type value_type: int
+        """
+        self._codecs.pop(value_type, None)
+
+    def get(self, value_type):
+        """
+        Get the codec of a value type.
+
+        :param value_type: The number stored in ``DynamicColumn.value_type``.
+        :type value_type: int
+        :rtype: A ``ValueCodec`` object.
+        :raises ValueError: If no codec is registered for the value type.
+        """
+        try:
+            return self._codecs[value_type][0]
+        except KeyError:
+            raise ValueError("No codec is registered for value type "
+                             "{}.".format(value_type))
+
+    def get_label(self, value_type, default=''):
+        """
+        Get the label of a value type.
+
+        :param value_type: The number stored in ``DynamicColumn.value_type``.
+        :type value_type: int
+        :param default: Returned if the value type is not registered.
+        :rtype: The label.
+        """
+        return self._codecs.get(value_type, (None, default))[1]
+
+    @property
+    def choices(self):
+        """
+        The value types and their labels in registration order, used for
+        HTML select option tags.
+
+        :rtype: A ``list`` of ``(value_type, label)`` tuples.
+        """
+        return [(value_type, label)
+                for value_type, (codec, label) in self._codecs.items()]
+
+
+codec_registry = CodecRegistry()
@@ -14,9 +14,12 @@ import dateutil
 
 from django import forms
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 
 from .manager import dcolumn_manager
+from .schema import schema_cache
+from .codecs import codec_registry
 from .models import CollectionBase, DynamicColumn, ColumnCollection, KeyValue
 
 log = logging.getLogger('dcolumns.dcolumns.forms')
@@ -58,8 +61,7 @@ class CollectionBaseFormMixin(forms.ModelForm):
         obj = None
 
         try:
-            obj = ColumnCollection.objects.active().get(
-                related_model__iexact=self.Meta.model.__name__)
+            obj = schema_cache.get_schema(self.Meta.model.__name__).collection
         except ColumnCollection.DoesNotExist as e: # pragma: no cover
             msg = _("A ColumnCollection needs to exist before creating "
                     "this object, found collection name {}."
@@ -71,7 +73,10 @@ class CollectionBaseFormMixin(forms.ModelForm):
 
     def clean(self):
         """
-        Run validation on models that inherit ``CollectionBase``.
+        Run validation on models that inherit ``CollectionBase``. Every
+        submitted ``KeyValue`` value is converted and validated here so all
+        the field errors are reported at the same time.
+
         :rtype: The Django ``cleaned_data`` dict.
         """
         cleaned_data = super(CollectionBaseFormMixin, self).clean()
@@ -81,21 +86,72 @@ class CollectionBaseFormMixin(forms.ModelForm):
                 self.Meta.model.__name__, by_slug=True)
         except Exception as e: # pragma: no cover
             self.add_error(None, str(e))
+        else:
+            self._set_key_values(cleaned_data)
 
         log.debug("cleaned_data: %s, relations: %s",
                   cleaned_data, self.relations)
         return cleaned_data
 
+    def full_clean(self):
+        """
+        Validate the form. If the form is not valid the ``KeyValue`` values
+        set on the instance by ``clean()`` are dropped, so a rejected value
+        is neither shown nor saved later.
+        """
+        super(CollectionBaseFormMixin, self).full_clean()
+
+        if self._errors and self.relations:
+            self.instance.discard_deferred()
+
+    def _set_key_values(self, cleaned_data):
+        """
+        Set the submitted values on the instance as deferred ``KeyValue``
+        objects. The schema is in memory and the existing ``KeyValue``
+        objects are loaded with one query, so the number of queries does
+        not depend on the number of columns.
+
+        :param cleaned_data: The Django ``cleaned_data`` dict.
+        :type cleaned_data: dict
+        """
+        inst = self.instance
+        collection = cleaned_data.get('column_collection')
+
+        # The model fields are only set on the instance after clean().
+        if collection and inst.column_collection_id is None:
+            inst.column_collection = collection
+
+        inst.load_key_values()
+        error_map = {}
+
+        for slug, value in dict(cleaned_data).items():
+            relation = self.relations.get(slug)
+            if value is None or not relation: continue
+            required = relation.get('required')
+            force = value == ''
+
+            try:
+                inst.set_key_value(slug, value, force=force, defer=True)
+            except ValueError as e:
+                error_map[slug] = [value, force, required, str(e)]
+
+                if required or value:
+                    self.add_error(slug, e)
+
+        if error_map:
+            log.error("Has Validations errors, error_map--(slug: [value, "
+                      "force, required, exception): %s, data: %s",
+                      error_map, cleaned_data)
+
     def save(self, commit=True):
         """
-        Saves a record that inherits from ``CollectionBase`` and all the
-        ``KeyValue`` objects related to it.
+        Saves a record that inherits from ``CollectionBase`` and the
+        changed ``KeyValue`` objects related to it in one transaction.
+
         :param commit: If ``True`` the record is saved else not saved.
         """
         inst = super(CollectionBaseFormMixin, self).save(commit=False)
         request = self.initial.get('request')
-        data = dict(self.cleaned_data)
-        error = False
 
         if request:
             inst.updater = request.user
@@ -105,33 +161,10 @@ class CollectionBaseFormMixin(forms.ModelForm):
                 inst.creator = request.user
                 inst.active = True
 
-        error_map = {}
-
-        for slug, value in data.items():
-            if value is None: continue
-            relation = self.relations.get(slug)
-            force = False if value != '' else True
-
-            if relation:
-                required = relation.get('required')
-
-                try:
-                    inst.set_key_value(slug, value, force=force, defer=True)
-                except ValueError as e:
-                    error = True
-                    error_map[slug] = [value, force, required, str(e)]
-
-                    if required or (not required and value):
-                        self.add_error(slug, e)
-
-        if error_map or error:
-            log.error("Has Validations errors: %s, "
-                      "error_map--(slug: [value, force, required, "
-                      "exception): %s, data: %s", error, error_map, data)
-
-        if commit and not error:
-            inst.save()
-            inst.save_deferred()
+        if commit:
+            with transaction.atomic():
+                inst.save()
+                inst.save_deferred()
 
         return inst
 
@@ -220,7 +253,8 @@ class DynamicColumnAdminForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         """
-        The constructor sets up the proper ``relation`` field HTML object.
+        The constructor sets up the proper ``value_type`` and ``relation``
+        field HTML objects.
         """
         self.request = kwargs.pop('request', None)
 
@@ -229,6 +263,9 @@ class DynamicColumnAdminForm(forms.ModelForm):
             self.request = initial.get('request')
 
         super(DynamicColumnAdminForm, self).__init__(*args, **kwargs)
+        self.fields['value_type'] = forms.TypedChoiceField(
+            widget=forms.Select, coerce=int, choices=codec_registry.choices,
+            label=_("Value Type"), help_text=_("Choose the value type."))
         self.fields['location'] = forms.ChoiceField(
             widget=forms.Select, choices=dcolumn_manager.css_containers)
         self.fields['relation'] = forms.ChoiceField(
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+#
+# dcolumn/dcolumns/kv_cache.py
+#
+
+"""
+A read-through cache of the serialized ``KeyValue`` values of each
+object. A bounded LRU in this process is checked first, then the Django
+cache shared by all the processes. Each object has a generation number in
+the Django cache that is bumped when its values change, so the stale
+entries in every process are simply never read again.
+"""
+__docformat__ = "restructuredtext en"
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import translation
+
+from .manager import dcolumn_manager
+from .schema import schema_cache
+
+log = logging.getLogger('dcolumns.dcolumns.kv_cache')
+
+
+class LRUCache(object):
+    """
+    A thread safe dict that keeps at most ``maxsize`` items, the least
+    recently used item is dropped first.
+    """
+
+    def __init__(self, maxsize):
+        """
+        Constructor.
+
+        :param maxsize: The maximum number of items kept.
+        :type maxsize: int
+        """
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class KeyValueCache(object):
+    """
+    Holds the serialized ``KeyValue`` values keyed by the object `pk`, its
+    generation, the schema version and the active language.
+    """
+    L1_SIZE = 1000
+    TIMEOUT = 3600
+    PREFIX = 'dcolumns:kv'
+
+    def __init__(self):
+        self._l1 = LRUCache(self.L1_SIZE)
+
+    def clear(self):
+        """
+        Drop the entries kept in this process.
+        """
+        self._l1.clear()
+
+    def get_or_set(self, pk, variant, func):
+        """
+        Get the cached values of an object, calling ``func`` to build them
+        on a miss.
+
+        :param pk: The `pk` of the ``CollectionBase`` object.
+        :type pk: int
+        :param variant: Anything hashable that changes the result, for
+                        example the ``by_slug`` argument.
+        :param func: Called with no arguments to build the values.
+        :type func: callable
+        :rtype: A new dict of the values.
+        """
+        cache = caches[dcolumn_manager.cache_alias]
+        key = "{}:{}:{}:{}:{}:{}".format(
+            self.PREFIX, pk, self._get_generation(cache, pk),
+            schema_cache.version, translation.get_language(), variant)
+        result = self._l1.get(key)
+
+        if result is None:
+            result = cache.get(key)
+
+            if result is None:
+                result = func()
+                cache.set(key, result, self.TIMEOUT)
+                log.debug("Cached key values for pk %s.", pk)
+
+            self._l1.set(key, result)
+
+        return dict(result)
+
+    def invalidate(self, pk):
+        """
+        Bump the generation of an object in all the processes. This is done
+        again when the transaction commits so a request that read the old
+        values before the commit cannot leave them in the cache.
+
+        :param pk: The `pk` of the ``CollectionBase`` object.
+        :type pk: int
+        """
+        self._bump_generation(pk)
+        transaction.on_commit(lambda: self._bump_generation(pk))
+
+    def key_value_changed(self, sender, instance, **kwargs):
+        """
+        Signal receiver for the ``KeyValue`` saves and deletes.
+        """
+        self.invalidate(instance.collection_id)
+
+    def key_values_changed(self, sender, instance, **kwargs):
+        """
+        Signal receiver for ``key_values_changed``.
+        """
+        self.invalidate(instance.pk)
+
+    def _get_generation_key(self, pk):
+        return "{}:gen:{}".format(self.PREFIX, pk)
+
+    def _get_generation(self, cache, pk):
+        key = self._get_generation_key(pk)
+        generation = cache.get(key)
+
+        if generation is None:
+            # Seeded with the time so a lost key never brings back an old
+            # generation.
+            cache.add(key, int(time.time() * 1000), None)
+            generation = cache.get(key)
+
+        return generation
+
+    def _bump_generation(self, pk):
+        cache = caches[dcolumn_manager.cache_alias]
+        key = self._get_generation_key(pk)
+
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, int(time.time() * 1000), None)
+
+
+kv_cache = KeyValueCache()
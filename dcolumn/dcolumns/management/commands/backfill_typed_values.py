@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+#
+# dcolumn/dcolumns/management/commands/backfill_typed_values.py
+#
+
+"""
+Fill the typed value columns of the existing ``KeyValue`` records.
+
+This command should be run after applying the migration that adds the
+typed columns. Until then the text values are converted on every read.
+"""
+__docformat__ = "restructuredtext en"
+
+import logging
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from dcolumn.dcolumns.models import DynamicColumn, KeyValue
+
+log = logging.getLogger('dcolumns.dcolumns.commands')
+
+
+class Command(BaseCommand):
+    help = ("Fill the typed value columns of the KeyValue records from their "
+            "text values, in batches.")
+    VALUE_TYPES = (DynamicColumn.NUMBER, DynamicColumn.FLOAT,
+                   DynamicColumn.BOOLEAN, DynamicColumn.DATE,
+                   DynamicColumn.DATETIME)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-b', '--batch-size', type=int, default=1000, dest='batch_size',
+            help="The number of KeyValue records updated per transaction.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = self.find_empty()
+        last_pk = 0
+        found = filled = 0
+
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch: break
+            last_pk = batch[-1].pk
+            found += len(batch)
+            filled += self.fill(batch)
+
+        msg = "Found {} KeyValue record(s), filled {}.".format(found, filled)
+        log.info(msg)
+        self.stdout.write(msg)
+
+    def find_empty(self):
+        """
+        Find the ``KeyValue`` records with a value whose typed columns are
+        all empty, in `pk` order.
+
+        :rtype: A queryset of ``KeyValue`` objects.
+        """
+        empty = Q()
+
+        for field in KeyValue.TYPED_FIELDS:
+            empty &= Q(**{field + '__isnull': True})
+
+        return (KeyValue.objects.select_related('dynamic_column')
+                .filter(empty, dynamic_column__value_type__in=self.VALUE_TYPES,
+                        value__isnull=False)
+                .exclude(value='').order_by('pk'))
+
+    def fill(self, batch):
+        """
+        Fill and save the typed columns of a batch in one transaction.
+        Values that cannot be converted are left empty.
+
+        :param batch: The ``KeyValue`` objects from ``find_empty``.
+        :type batch: list
+        :rtype: The number of records filled.
+        """
+        records = []
+
+        for obj in batch:
+            obj.set_typed_values()
+
+            if any(getattr(obj, field) is not None
+                   for field in KeyValue.TYPED_FIELDS):
+                records.append(obj)
+
+        if records:
+            with transaction.atomic():
+                KeyValue.objects.bulk_update(records, KeyValue.TYPED_FIELDS)
+
+        log.debug("Filled %s of %s KeyValue record(s).",
+                  len(records), len(batch))
+        return len(records)
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+#
+# dcolumn/dcolumns/management/commands/merge_keyvalues.py
+#
+
+"""
+Merge duplicate ``KeyValue`` records.
+
+This command must be run before applying the migration that adds the
+unique constraint on ``(collection, dynamic_column)``.
+"""
+__docformat__ = "restructuredtext en"
+
+import logging
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.db.models.functions import Coalesce
+
+from dcolumn.dcolumns.models import KeyValue
+
+log = logging.getLogger('dcolumns.dcolumns.commands')
+
+
+class Command(BaseCommand):
+    help = ("Find and merge duplicate KeyValue records, keeping the newest "
+            "non-empty value for each collection and dynamic column.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-b', '--batch-size', type=int, default=500, dest='batch_size',
+            help="The number of duplicate sets to merge per transaction.")
+        parser.add_argument(
+            '-n', '--dry-run', action='store_true', default=False,
+            dest='dry_run', help="Report the duplicates without deleting.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+        groups = self.find_duplicates()
+        batch = []
+        found = deleted = 0
+
+        for group in groups.iterator():
+            found += 1
+            batch.append(group)
+
+            if len(batch) >= batch_size:
+                deleted += self.merge(batch, dry_run)
+                batch[:] = []
+
+        if batch:
+            deleted += self.merge(batch, dry_run)
+
+        msg = "Found {} duplicate set(s), {} {} KeyValue record(s).".format(
+            found, "would delete" if dry_run else "deleted", deleted)
+        log.info(msg)
+        self.stdout.write(msg)
+
+    def find_duplicates(self):
+        """
+        Find each ``(collection, dynamic_column)`` pair that has more than
+        one ``KeyValue`` record and the pk of the record to keep.
+
+        :rtype: A queryset of dicts.
+        """
+        has_value = Q(value__isnull=False) & ~Q(value='')
+        return (KeyValue.objects.order_by()
+                .values('collection_id', 'dynamic_column_id')
+                .annotate(count=Count('pk'),
+                          keep=Coalesce(Max('pk', filter=has_value),
+                                        Max('pk')))
+                .filter(count__gt=1))
+
+    def merge(self, batch, dry_run=False):
+        """
+        Delete all but the kept record of each duplicate set in one
+        transaction.
+
+        :param batch: The duplicate sets from ``find_duplicates``.
+        :type batch: list
+        :param dry_run: If ``True`` nothing is deleted.
+        :type dry_run: bool
+        :rtype: The number of records deleted or that would be deleted.
+        """
+        query = Q()
+
+        for group in batch:
+            query |= Q(collection_id=group['collection_id'],
+                       dynamic_column_id=group['dynamic_column_id'])
+
+        # Only the columns of the schema before the constraint migration
+        # are read, the delete signals just need the collection.
+        queryset = KeyValue.objects.filter(query).exclude(
+            pk__in=[group['keep'] for group in batch]).order_by().only(
+            'pk', 'collection')
+
+        if dry_run:
+            count = queryset.count()
+        else:
+            with transaction.atomic():
+                count = queryset.delete()[0]
+
+        log.debug("Merged %s duplicate set(s), count: %s", len(batch), count)
+        return count
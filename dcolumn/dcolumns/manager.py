@@ -10,6 +10,8 @@ __docformat__ = "restructuredtext en"
 
 import logging
 import warnings
+from collections import namedtuple
+from types import MappingProxyType
 
 from django.conf import settings
 from django.utils.translation import gettext, gettext_lazy as _
@@ -17,6 +19,13 @@ from django.db.models.query import QuerySet
 
 log = logging.getLogger('dcolumns.dcolumns.manager')
 
+#
+# The compiled registry, see DynamicColumnManager.freeze().
+#
+Registry = namedtuple('Registry', (
+    'choice_relations', 'choice_relation_map', 'choice_map',
+    'relation_model_field', 'css_containers', 'css_container_map'))
+
 
 class DynamicColumnManager(object):
     """
@@ -28,6 +37,7 @@ class DynamicColumnManager(object):
     _choice_map = {}
     _css_containers = []
     _css_container_map = {}
+    _registry = None
 
     def __init__(self):
         """
@@ -35,6 +45,50 @@ class DynamicColumnManager(object):
         """
         self.__dict__ = self.__shared_state
 
+    def freeze(self):
+        """
+        Compile the registered choices and CSS containers into a read only
+        snapshot. This is called by ``AppConfig.ready()`` after all the
+        models have registered their choices, afterwards the properties of
+        this manager are served from the snapshot and any further
+        registration raises an exception.
+        """
+        relations = self._sort_relations()
+        relation_map = dict(relations)
+        self._registry = Registry(
+            choice_relations=tuple(relations),
+            choice_relation_map=MappingProxyType(relation_map),
+            choice_map=MappingProxyType(dict(self._choice_map)),
+            relation_model_field=MappingProxyType({
+                num: self._choice_map[name]
+                for num, name in self._relations}),
+            css_containers=tuple(self._css_containers),
+            css_container_map=MappingProxyType(dict(self._css_containers)))
+        log.debug("Froze registry: %s", self._registry)
+
+    def _thaw(self):
+        """
+        Drop the compiled snapshot so choices can be registered again.
+
+        .. note::
+            This is an undocumented method and should only be used for testing.
+        """
+        self._registry = None
+
+    def _check_frozen(self, item):
+        """
+        Raise an exception if the registry has already been compiled.
+
+        :param item: The item being registered, used in the message.
+        :raises RuntimeError: If ``freeze`` has been called.
+        """
+        if self._registry is not None:
+            msg = ("Cannot register '{}' after the dcolumns application is "
+                   "ready, register it when your models module is "
+                   "imported.").format(item)
+            log.critical(msg)
+            raise RuntimeError(msg)
+
     def register_choice(self, choice, relation_num, field):
         """
         Register choice field types. These can be Foreign Key or
@@ -51,7 +105,10 @@ class DynamicColumnManager(object):
         :param field: A field from the model or choice object used as the HTML
                       select option text.
         :type field: str
+        :raises RuntimeError: If called after the application is ready.
         """
+        self._check_frozen(choice)
+
         if relation_num in self._relation_numbers:
             msg = ("Invalid relation number {} is already used. [choice: {}, "
                    "field: {}]").format(relation_num, choice, field)
@@ -122,13 +179,25 @@ class DynamicColumnManager(object):
         """
         A property that returns the HTML select option choices.
 
-        :rtype: A ``list`` of the choices.
+        :rtype: A ``tuple`` of the choices or an empty ``list`` if no
+                choices are registered.
         """
-        if len(self._relations) and self._relations[0][0] != 0:
-            self._relations.sort(key=lambda x: x[1].lower())
-            self._relations.insert(0, (0, _("Choose a Relation")))
+        registry = self._registry
+
+        if registry is None:
+            relations = tuple(self._sort_relations())
+        else:
+            relations = registry.choice_relations
+
+        return relations or []
+
+    def _sort_relations(self):
+        relations = sorted(self._relations, key=lambda x: x[1].lower())
 
-        return self._relations
+        if relations:
+            relations.insert(0, (0, _("Choose a Relation")))
+
+        return relations
 
     @property
     def choice_relation_map(self):
@@ -139,7 +208,12 @@ class DynamicColumnManager(object):
                 is the number given when added with the register_choice method.
                 The value is the string representation of the choice object.
         """
-        return dict(self._relations)
+        registry = self._registry
+
+        if registry is None:
+            return dict(self.choice_relations)
+
+        return registry.choice_relation_map
 
     @property
     def choice_map(self):
@@ -151,7 +225,12 @@ class DynamicColumnManager(object):
                 and the value is a tuple of the model/choice object and the
                 field.
         """
-        return self._choice_map
+        registry = self._registry
+
+        if registry is None:
+            return self._choice_map
+
+        return registry.choice_map
 
     def register_css_containers(self, container_list):
         """
@@ -171,7 +250,10 @@ class DynamicColumnManager(object):
         :type container_list: list or tuple
         :raises TypeError: If ``container_list`` is not a ``list`` or
                            ``tuple``.
+        :raises RuntimeError: If called after the application is ready.
         """
+        self._check_frozen(container_list)
+
         if isinstance(container_list, (list, tuple)):
             if len(container_list) <= 0:
                 msg = ("Must supply at least one CSS container. The format "
@@ -209,24 +291,37 @@ class DynamicColumnManager(object):
     @property
     def css_containers(self):
         """
-        A property that returns a list of tuples where the key is the
-        template variable name and the CSS container class.
+        A property that returns the tuples where the key is the template
+        variable name and the CSS container class. It is a read only
+        ``tuple`` once the app is ready.
 
-        :rtype: A list of tuples where the tuple is
+        :rtype: A list or tuple of tuples where the tuple is
                 ``(<template var>, <CSS class name>)``.
         """
-        return self._css_containers
+        registry = self._registry
+
+        if registry is None:
+            return self._css_containers
+
+        return registry.css_containers
 
     @property
     def css_container_map(self):
         """
         A property that returns a dict where the key is the CSS container
         number and the value is the CSS class or id. This property should be
-        used in templates to designate location in the HTML.
+        used in templates to designate location in the HTML. It is read
+        only once the app is ready.
 
-        :rtype: A ``dict`` of the CSS container classes.
+        :rtype: A ``dict`` or, once the app is ready, a read only
+                ``MappingProxyType`` of the CSS container classes.
         """
-        return self._css_container_map
+        registry = self._registry
+
+        if registry is None:
+            return self._css_container_map
+
+        return registry.css_container_map
 
     def get_collection_name(self, model_name):
         """
@@ -271,6 +366,22 @@ class DynamicColumnManager(object):
 
         return result
 
+    @property
+    def cache_alias(self):
+        """
+        Gets the value of settings.DYNAMIC_COLUMNS.CACHE_ALIAS. This is the
+        Django cache used to share state between processes. The default is
+        ``'default'``.
+
+        :rtype: str
+        """
+        if hasattr(settings, 'DYNAMIC_COLUMNS'):
+            result = settings.DYNAMIC_COLUMNS.get('CACHE_ALIAS', 'default')
+        else:
+            result = 'default'
+
+        return result
+
     def get_related_object_names(self, choose=True):
         """
         This method provides the models that inherit ``CollectionBase``
@@ -303,7 +414,12 @@ class DynamicColumnManager(object):
         :rtype: The model object and field used in the HTML select option text
                 value.
         """
-        return self.choice_map.get(self.choice_relation_map.get(relation),
-                                   (None, None))
+        registry = self._registry
+
+        if registry is None:
+            return self.choice_map.get(self.choice_relation_map.get(relation),
+                                       (None, None))
+
+        return registry.relation_model_field.get(relation, (None, None))
 
 dcolumn_manager = DynamicColumnManager()
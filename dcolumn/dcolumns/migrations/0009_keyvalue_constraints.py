@@ -0,0 +1,69 @@
+# Generated by Django 3.2.19 on 2026-10-18 04:34
+
+from django.db import migrations, models
+from django.db.models.functions import Cast, Substr
+
+# Run the merge_keyvalues command before this migration, the unique
+# constraint cannot be added while there are duplicates.
+
+VALUE_INDEX = models.Index(
+    models.F('dynamic_column'),
+    Cast(Substr('value', 1, 255), models.CharField(max_length=255)),
+    name='dcolumns_kv_column_value_idx')
+UNIQUE_CONSTRAINT = models.UniqueConstraint(
+    fields=('collection', 'dynamic_column'),
+    name='dcolumns_keyvalue_unique_collection_column')
+
+
+def add_indexes(apps, schema_editor):
+    KeyValue = apps.get_model('dcolumns', 'KeyValue')
+
+    if schema_editor.connection.vendor == 'postgresql':
+        # Build the indexes without locking writes to the table, then
+        # turn the unique index into the constraint.
+        qn = schema_editor.quote_name
+        table = qn(KeyValue._meta.db_table)
+        name = qn(UNIQUE_CONSTRAINT.name)
+        schema_editor.add_index(KeyValue, VALUE_INDEX, concurrently=True)
+        schema_editor.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY {} ON {} "
+            "(collection_id, dynamic_column_id)".format(name, table))
+        schema_editor.execute(
+            "ALTER TABLE {} ADD CONSTRAINT {} UNIQUE USING INDEX {}".format(
+                table, name, name))
+    else:
+        schema_editor.add_index(KeyValue, VALUE_INDEX)
+        schema_editor.add_constraint(KeyValue, UNIQUE_CONSTRAINT)
+
+
+def remove_indexes(apps, schema_editor):
+    KeyValue = apps.get_model('dcolumns', 'KeyValue')
+    schema_editor.remove_index(KeyValue, VALUE_INDEX)
+    schema_editor.remove_constraint(KeyValue, UNIQUE_CONSTRAINT)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('dcolumns', '0008_alter_collectionbase_creator_and_more'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(add_indexes, remove_indexes),
+                ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='keyvalue',
+                    index=VALUE_INDEX,
+                ),
+                migrations.AddConstraint(
+                    model_name='keyvalue',
+                    constraint=UNIQUE_CONSTRAINT,
+                ),
+                ],
+        ),
+    ]
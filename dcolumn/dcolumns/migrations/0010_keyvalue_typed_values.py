@@ -0,0 +1,33 @@
+# Generated by Django 3.2.19 on 2026-10-18 05:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dcolumns', '0009_keyvalue_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='keyvalue',
+            name='bool_value',
+            field=models.BooleanField(blank=True, editable=False, null=True, verbose_name='Boolean Value'),
+        ),
+        migrations.AddField(
+            model_name='keyvalue',
+            name='datetime_value',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Date Time Value'),
+        ),
+        migrations.AddField(
+            model_name='keyvalue',
+            name='float_value',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Float Value'),
+        ),
+        migrations.AddField(
+            model_name='keyvalue',
+            name='int_value',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, verbose_name='Integer Value'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.19 on 2026-10-18 05:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dcolumns', '0010_keyvalue_typed_values'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dynamiccolumn',
+            name='value_type',
+            field=models.IntegerField(help_text='Choose the value type.', verbose_name='Value Type'),
+        ),
+    ]
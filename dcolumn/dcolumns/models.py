@@ -11,12 +11,16 @@ __docformat__ = "restructuredtext en"
 
 import logging
 import datetime
-from dateutil import parser
 from collections import OrderedDict
 
-from django.db import models
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import models, transaction, IntegrityError
+from django.db.models.functions import Cast, Coalesce, NullIf, Substr
+from django.db.models.expressions import Exists, OuterRef, Subquery
 from django.utils.html import format_html, format_html_join
 from django.utils.safestring import mark_safe
+from django.utils import timezone, translation
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 
@@ -27,6 +31,13 @@ from dcolumn.common.model_mixins import (
     ValidateOnSaveMixin)
 
 from .manager import dcolumn_manager
+from .schema import schema_cache
+from .kv_cache import kv_cache
+from .signals import key_values_changed
+from .codecs import (
+    codec_registry, BooleanCodec, ChoiceCodec, DateCodec, DateTimeCodec,
+    FloatCodec, NumberCodec, TimeCodec, ValueCodec)
+from .choice_index import choice_index_cache
 
 log = logging.getLogger('dcolumns.dcolumns.models')
 
@@ -46,14 +57,7 @@ class DynamicColumnManager(StatusModelManagerMixin):
 
         :rtype: A dict of ``{<relation class name>: <slug>, ...}``.
         """
-        result = {}
-
-        for record in self.active():
-            if record.value_type == self.model.CHOICE:
-                name = dcolumn_manager.choice_relation_map.get(record.relation)
-                result[name] = record.slug
-
-        return result
+        return schema_cache.get_fk_slugs()
 
 
 class DynamicColumn(TimeModelMixin, UserModelMixin, StatusModelMixin,
@@ -104,7 +108,7 @@ class DynamicColumn(TimeModelMixin, UserModelMixin, StatusModelMixin,
                     "however, if you want to prevent it from changing when "
                     "the name changes enter a preferred slug above."))
     value_type = models.IntegerField(
-        verbose_name=_("Value Type"), choices=VALUE_TYPES,
+        verbose_name=_("Value Type"),
         help_text=_("Choose the value type."))
     relation = models.IntegerField(
         verbose_name=_("Choice Relation"), null=True, blank=True,
@@ -139,6 +143,16 @@ class DynamicColumn(TimeModelMixin, UserModelMixin, StatusModelMixin,
         return result
     relation_producer.short_description = _("Relation")
 
+    def value_type_producer(self):
+        """
+        Produces the label of the ``value_type`` that is used in the Django
+        admin.
+
+        :rtype: The label or the ``value_type`` if it is not registered.
+        """
+        return codec_registry.get_label(self.value_type, self.value_type)
+    value_type_producer.short_description = _("Value Type")
+
     def collection_producer(self):
         """
         Produces a ``Collection`` name that is used in the Django admin.
@@ -163,6 +177,12 @@ class DynamicColumn(TimeModelMixin, UserModelMixin, StatusModelMixin,
         else:
             self.slug = create_field_name(self.name)
 
+        if self.value_type not in codec_registry:
+            msg = _("Must choose a registered value type, found {}."
+                    ).format(self.value_type)
+            log.warning(msg)
+            raise ValidationError({'value_type': [msg]})
+
         # Test that if the value_type is set to CHOICE that the relation
         # is also set.
         if ((self.value_type == self.CHOICE and not self.relation) or
@@ -171,11 +191,56 @@ class DynamicColumn(TimeModelMixin, UserModelMixin, StatusModelMixin,
             log.warning(msg)
             raise ValidationError({'relation': [msg]})
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Keep the ``value_type`` loaded from the database for ``save``.
+        """
+        instance = super(DynamicColumn, cls).from_db(db, field_names, values)
+        instance._loaded_value_type = instance.__dict__.get('value_type')
+        return instance
+
     def save(self, *args, **kwargs):
         """
-        Be sure the complete MRO has their saves called.
+        Be sure the complete MRO has their saves called. If the
+        ``value_type`` changed the typed columns of the ``KeyValue``
+        objects are filled again.
+        """
+        loaded = getattr(self, '_loaded_value_type', self.value_type)
+
+        with transaction.atomic():
+            super(DynamicColumn, self).save(*args, **kwargs)
+
+            if loaded != self.value_type:
+                self._update_typed_values()
+
+        self._loaded_value_type = self.value_type
+
+    def _update_typed_values(self):
+        """
+        Fill the typed columns of all the ``KeyValue`` objects of this
+        ``DynamicColumn`` from their text as per the current
+        ``value_type``.
         """
-        super(DynamicColumn, self).save(*args, **kwargs)
+        objs = []
+        pks = set()
+
+        for obj in self.keyvalues.only(
+                'pk', 'collection', 'value').order_by().iterator():
+            obj.dynamic_column = self
+            obj.set_typed_values()
+            objs.append(obj)
+            pks.add(obj.collection_id)
+
+        KeyValue.objects.bulk_update(
+            objs, KeyValue.TYPED_FIELDS, batch_size=1000)
+
+        # The bulk query does not send the KeyValue signals.
+        for pk in pks:
+            kv_cache.invalidate(pk)
+
+        log.debug("Updated the typed values of %s KeyValue objects for "
+                  "DynamicColumn '%s'.", len(objs), self.slug)
 
     def __str__(self):
         return "{} ({})".format(
@@ -206,10 +271,94 @@ class DynamicColumn(TimeModelMixin, UserModelMixin, StatusModelMixin,
         """
         return dcolumn_manager.get_relation_model_field(self.relation)
 
+    def get_value_expression(self, name='value'):
+        """
+        Gets a database expression that converts the text stored in a
+        ``KeyValue`` value to the type of this ``DynamicColumn``. Empty
+        values become ``NULL``. ``BOOLEAN`` values stored as text or as
+        numbers are both converted. The typed column of the ``KeyValue``
+        is used when it is filled, the text is cast when it is not.
+
+        :param name: The name or path of the ``KeyValue`` value field.
+        :type name: str
+        :rtype: A Django expression.
+        """
+        value = NullIf(name, models.Value(''))
+        prefix = name[:-len('value')]
+
+        if self.value_type == self.BOOLEAN:
+            expression = models.Case(
+                models.When(models.Q(**{name + '__iregex':
+                                        r'^(true|yes|0*[1-9][0-9]*)$'}),
+                            then=models.Value(True)),
+                models.When(models.Q(**{name + '__iregex':
+                                        r'^(false|no|0+)$'}),
+                            then=models.Value(False)),
+                default=models.Value(None),
+                output_field=models.BooleanField(null=True))
+            expression = Coalesce(prefix + 'bool_value', expression,
+                                  output_field=expression.output_field)
+        elif self.value_type == self.NUMBER:
+            expression = Coalesce(prefix + 'int_value',
+                                  Cast(value, models.BigIntegerField()),
+                                  output_field=models.BigIntegerField())
+        elif self.value_type == self.CHOICE and not self.store_relation:
+            expression = Cast(value, models.BigIntegerField())
+        elif self.value_type == self.FLOAT:
+            expression = Coalesce(prefix + 'float_value',
+                                  Cast(value, models.FloatField()),
+                                  output_field=models.FloatField())
+        elif self.value_type == self.DATE:
+            expression = Coalesce(
+                Cast(prefix + 'datetime_value', models.DateField()),
+                Cast(value, models.DateField()))
+        elif self.value_type == self.DATETIME:
+            expression = Coalesce(prefix + 'datetime_value',
+                                  Cast(value, models.DateTimeField()),
+                                  output_field=models.DateTimeField())
+        elif self.value_type == self.TIME:
+            expression = Cast(value, models.TimeField())
+        else:
+            expression = Cast(value, models.TextField())
+
+        return expression
+
+
+def _register_codecs():
+    """
+    Register the codecs of the built in value types.
+    """
+    for value_type, codec in ((DynamicColumn.BOOLEAN, BooleanCodec()),
+                              (DynamicColumn.CHOICE, ChoiceCodec()),
+                              (DynamicColumn.DATE, DateCodec()),
+                              (DynamicColumn.DATETIME, DateTimeCodec()),
+                              (DynamicColumn.FLOAT, FloatCodec()),
+                              (DynamicColumn.NUMBER, NumberCodec()),
+                              (DynamicColumn.TEXT, ValueCodec()),
+                              (DynamicColumn.TEXT_BLOCK, ValueCodec()),
+                              (DynamicColumn.TIME, TimeCodec())):
+        codec_registry.register(
+            value_type, codec, DynamicColumn.VALUE_TYPES_MAP[value_type])
+
+_register_codecs()
+
 
 #
 # ColumnCollection
 #
+class SerializedColumns(OrderedDict):
+    """
+    The result of ``ColumnCollectionManager.serialize_columns``. The items
+    are also grouped in ``locations``, an OrderedDict keyed by the CSS
+    container class in the order the containers were registered. Each
+    value is a list of the items in that container sorted by their order.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(SerializedColumns, self).__init__(*args, **kwargs)
+        self.locations = OrderedDict()
+
+
 class ColumnCollectionManager(StatusModelManagerMixin):
     """
     Manager for the ``ColumnCollection`` model.
@@ -261,11 +410,12 @@ class ColumnCollectionManager(StatusModelManagerMixin):
                         dynamic column's ``pk``, if True the dynamic
                         column's ``slug`` is used.
         :type by_slug: bool
-        :rtype: An OrderedDict of serialized ``KeyValue`` values and their
-                ``DynamicColumn`` meta data.
+        :rtype: A ``SerializedColumns`` OrderedDict of serialized
+                ``KeyValue`` values and their ``DynamicColumn`` meta data.
         """
-        records = self.get_column_collection(name)
-        result = OrderedDict()
+        records = schema_cache.get_schema(name).active_columns
+        result = SerializedColumns()
+        locations = {}
 
         if obj:
             key_value_map = obj.serialize_key_values()
@@ -287,16 +437,38 @@ class ColumnCollectionManager(StatusModelManagerMixin):
                 rec['store_relation'] = record.store_relation
 
             rec['required'] = record.required
-            location = record.location
-            # We convert the list to a dict because css_container_map may
-            # not be keyed with integers.
-            rec['location'] = dict(dcolumn_manager.css_containers).get(
-                location, '')
+            rec['location'] = dcolumn_manager.css_container_map.get(
+                record.location, '')
             rec['order'] = record.order
             if obj: rec['value'] = key_value_map.get(record.pk, '')
+            locations.setdefault(rec['location'], []).append(rec)
+
+        for css in dcolumn_manager.css_container_map.values():
+            if css in locations:
+                result.locations[css] = sorted(
+                    locations.pop(css), key=lambda rec: rec['order'])
 
+        # Locations that are no longer registered.
+        result.locations.update(locations)
         return result
 
+    async def aserialize_columns(self, name, obj=None, by_slug=False):
+        """
+        The async version of ``serialize_columns``. The queries are run in
+        the thread of the request with ``sync_to_async``.
+
+        :param name: Name of the collection.
+        :type name: str
+        :param obj: Optional model object that inherits from
+                    ``CollectionBase``.
+        :type obj: object
+        :param by_slug: See ``serialize_columns``.
+        :type by_slug: bool
+        :rtype: A ``SerializedColumns`` OrderedDict.
+        """
+        return await sync_to_async(self.serialize_columns)(
+            name, obj=obj, by_slug=by_slug)
+
     def get_active_relation_items(self, name):
         """
         Get a list of all active relation type choice items. The list is
@@ -307,7 +479,7 @@ class ColumnCollectionManager(StatusModelManagerMixin):
         :rtype: A ``list`` of all ``CHOICE`` items including both model and
                 choice items.
         """
-        records = self.get_column_collection(name)
+        records = schema_cache.get_schema(name).active_columns
         return [dcolumn_manager.choice_relation_map.get(record.relation)
                 for record in records if record.relation]
 
@@ -325,7 +497,7 @@ class ColumnCollectionManager(StatusModelManagerMixin):
         :type use_pk: bool
         :rtype: A list of tuples. ``[(<slug or pk>, <KeyValue name>), ...]``
         """
-        records = self.get_column_collection(name)
+        records = schema_cache.get_schema(name).active_columns
         choices = [(use_pk and r.pk or r.slug, r.name) for r in records]
         return choices
 
@@ -386,7 +558,282 @@ class ColumnCollection(TimeModelMixin, UserModelMixin, StatusModelMixin,
 #
 # CollectionBase
 #
-class CollectionBaseManager(models.Manager):
+class CollectionBaseQuerySet(models.QuerySet):
+    """
+    The queryset class for any model that inherits ``CollectionBase``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(CollectionBaseQuerySet, self).__init__(*args, **kwargs)
+        self._key_value_slugs = None
+        self._key_value_prefetch = False
+
+    def _clone(self):
+        clone = super(CollectionBaseQuerySet, self)._clone()
+        clone._key_value_slugs = self._key_value_slugs
+        clone._key_value_prefetch = self._key_value_prefetch
+        return clone
+
+    def with_key_values(self, slugs=None):
+        """
+        Prefetch the ``KeyValue`` and ``DynamicColumn`` objects for all the
+        records in this queryset. The ``CHOICE`` objects that the key values
+        point to are also fetched, with one query per relation model. After
+        the queryset is evaluated ``get_key_value`` (and the
+        ``single_display`` tag) will not do any more queries.
+
+        :param slugs: Optional list of slugs to limit the prefetch to.
+        :type slugs: list, tuple, or None
+        :rtype: A ``CollectionBaseQuerySet``.
+        """
+        queryset = KeyValue.objects.select_related('dynamic_column')
+
+        if slugs:
+            queryset = queryset.filter(dynamic_column__slug__in=slugs)
+
+        clone = self.prefetch_related(
+            models.Prefetch('keyvalues', queryset=queryset))
+        clone._key_value_slugs = frozenset(slugs) if slugs else None
+        clone._key_value_prefetch = True
+        return clone
+
+    def kv_q(self, **lookups):
+        """
+        Build a ``Q`` object from lookups on dynamic column values. The
+        keywords are a slug, optionally followed by a lookup, the same as
+        in a Django filter, for example ``edition__gt=2``. Each lookup
+        becomes an ``EXISTS`` subquery on the ``KeyValue`` table with the
+        value cast to the type of the ``DynamicColumn``. The ``Q`` objects
+        can be combined with ``|``, ``&``, and ``~``.
+
+        :param lookups: Slug lookups and their values.
+        :type lookups: dict
+        :rtype: A Django ``Q`` object.
+        :raises ValueError: If a slug is not in this model's collection.
+        """
+        dcs = self._get_lookup_dynamic_columns(lookups)
+        q = models.Q()
+
+        for key, value in lookups.items():
+            slug, sep, lookup = key.partition('__')
+            q &= self._key_value_exists(dcs[slug], lookup or 'exact', value)
+
+        return q
+
+    def filter_kv(self, *args, **lookups):
+        """
+        Filter this queryset on dynamic column values in the database.
+
+        :param args: ``Q`` objects, usually made with ``kv_q``.
+        :type args: list
+        :param lookups: Slug lookups, see ``kv_q``.
+        :type lookups: dict
+        :rtype: A ``CollectionBaseQuerySet``.
+        """
+        return self.filter(*args, self.kv_q(**lookups))
+
+    def exclude_kv(self, *args, **lookups):
+        """
+        Exclude records from this queryset on dynamic column values in the
+        database.
+
+        :param args: ``Q`` objects, usually made with ``kv_q``.
+        :type args: list
+        :param lookups: Slug lookups, see ``kv_q``.
+        :type lookups: dict
+        :rtype: A ``CollectionBaseQuerySet``.
+        """
+        return self.exclude(*args, self.kv_q(**lookups))
+
+    def annotate_kv(self, *slugs, **aliases):
+        """
+        Annotate each record with the typed values of dynamic columns
+        using correlated subqueries. The annotations can then be used in
+        ``order_by``, ``values``, ``values_list``, and filters so sorting
+        and pagination on dynamic columns is done in one SQL statement.
+        Records without a ``KeyValue`` object get ``None``.
+
+        :param slugs: Slugs to annotate, the annotation name is the slug.
+        :type slugs: list
+        :param aliases: Annotation names mapped to slugs, use these when a
+                        slug conflicts with a field on the model.
+        :type aliases: dict
+        :rtype: A ``CollectionBaseQuerySet``.
+        :raises ValueError: If a slug is not in this model's collection.
+        """
+        names = {slug: slug for slug in slugs}
+        names.update(aliases)
+        dcs = self._get_lookup_dynamic_columns(names.values())
+        annotations = {}
+
+        for name, slug in names.items():
+            dc = dcs[slug]
+            expression = dc.get_value_expression()
+            rows = KeyValue.objects.filter(
+                collection=OuterRef('pk'), dynamic_column=dc).annotate(
+                typed_value=expression).values('typed_value')[:1]
+            annotations[name] = Subquery(
+                rows, output_field=expression.output_field)
+
+        return self.annotate(**annotations)
+
+    def aggregate_kv(self, slug, aggregate=models.Count):
+        """
+        Aggregate the typed values of a dynamic column over the records in
+        this queryset in the database.
+
+        :param slug: The ``DynamicColumn`` slug.
+        :type slug: str
+        :param aggregate: A Django aggregate class such as ``Sum``,
+                          ``Avg``, ``Min``, ``Max``, or ``Count``
+                          (default). ``Count`` counts the non empty values.
+        :type aggregate: class
+        :rtype: The aggregated value or ``None`` if there are no values.
+        :raises ValueError: If a slug is not in this model's collection.
+        """
+        rows = self._get_key_value_rows(slug)
+        return rows.aggregate(result=aggregate('typed_value'))['result']
+
+    def group_by_kv(self, slug):
+        """
+        Count the records in this queryset for each distinct value of a
+        dynamic column in the database. ``CHOICE`` columns are counted by
+        the `pk` of the choice unless the relation value is stored.
+
+        :param slug: The ``DynamicColumn`` slug.
+        :type slug: str
+        :rtype: An ``OrderedDict`` of counts keyed by value, in value order.
+        :raises ValueError: If a slug is not in this model's collection.
+        """
+        rows = self._get_key_value_rows(slug).values(
+            'typed_value').annotate(count=models.Count('pk')).order_by(
+            'typed_value')
+        return OrderedDict((row['typed_value'], row['count'])
+                           for row in rows)
+
+    def _get_key_value_rows(self, slug):
+        """
+        Get the non empty ``KeyValue`` objects of this queryset for the
+        slug annotated with their typed value.
+        """
+        dc = self._get_lookup_dynamic_columns((slug,))[slug]
+        return KeyValue.objects.filter(
+            collection__in=self.values('pk'), dynamic_column=dc).annotate(
+            typed_value=dc.get_value_expression()).filter(
+            typed_value__isnull=False)
+
+    def _get_lookup_dynamic_columns(self, lookups):
+        """
+        Get the ``DynamicColumn`` objects in this model's collection for
+        the slugs in lookups.
+
+        :param lookups: Slug lookups or slugs.
+        :type lookups: dict, list, or other iterable
+        :rtype: A dict of ``DynamicColumn`` objects keyed by slug.
+        :raises ValueError: If a slug is not in this model's collection.
+        """
+        slugs = set(key.partition('__')[0] for key in lookups)
+        dcs = {}
+
+        if slugs:
+            try:
+                schema = schema_cache.get_schema(self.model.__name__)
+            except ColumnCollection.DoesNotExist:
+                pass
+            else:
+                dcs = {dc.slug: dc for dc in schema.active_columns}
+
+        for slug in slugs:
+            if slug not in dcs:
+                msg = "Could not find DynamicColumn for slug '{}'.".format(
+                    slug)
+                log.error(msg)
+                raise ValueError(msg)
+
+        return dcs
+
+    def _key_value_exists(self, dc, lookup, value):
+        """
+        Build the ``EXISTS`` subquery for one lookup.
+        """
+        if isinstance(value, (list, tuple)):
+            value = [getattr(v, 'pk', v) for v in value]
+        elif isinstance(value, (CollectionBase, BaseChoice)):
+            value = value.pk
+
+        expression = dc.get_value_expression()
+        rows = KeyValue.objects.filter(
+            collection=OuterRef('pk'), dynamic_column=dc).annotate(
+            typed_value=expression)
+
+        # A missing KeyValue is the same as an empty one.
+        if lookup == 'isnull':
+            q = Exists(rows.filter(typed_value__isnull=False))
+            result = ~models.Q(q) if value else models.Q(q)
+        else:
+            rows = rows.filter(**{'typed_value__' + lookup: value})
+
+            # Lets the database use the value index for text values.
+            if (lookup == 'exact' and isinstance(value, str) and
+                isinstance(expression.output_field, models.TextField)):
+                rows = rows.annotate(value_prefix=_value_prefix()).filter(
+                    value_prefix=value[:_VALUE_INDEX_LENGTH])
+
+            result = models.Q(Exists(rows))
+
+        return result
+
+    def _fetch_all(self):
+        prefetch = self._result_cache is None and self._key_value_prefetch
+        super(CollectionBaseQuerySet, self)._fetch_all()
+
+        if prefetch:
+            self._set_key_value_snapshots(
+                [obj for obj in self._result_cache
+                 if isinstance(obj, CollectionBase)])
+
+    def _set_key_value_snapshots(self, records):
+        """
+        Put the prefetched key values onto each record as its snapshot
+        then get all the ``CHOICE`` objects with one query per relation
+        model.
+
+        :param records: The objects in this queryset.
+        :type records: list
+        """
+        choice_pks = {}
+
+        for obj in records:
+            cache = {kv.dynamic_column.slug: kv
+                     for kv in obj.keyvalues.all()}
+            obj._key_value_cache = cache
+            obj._key_value_only = self._key_value_slugs
+            obj._key_value_pk = obj.pk
+
+            for kv in cache.values():
+                dc = kv.dynamic_column
+
+                if (dc.value_type == dc.CHOICE and not dc.store_relation
+                    and kv.value and kv.value.isdigit()
+                    and int(kv.value) != 0):
+                    choice_pks.setdefault(dc.relation, set()).add(
+                        int(kv.value))
+
+        choice_objects = {}
+
+        for relation, pks in choice_pks.items():
+            model, field = dcolumn_manager.get_relation_model_field(relation)
+
+            # Choice objects are already in memory.
+            if model and issubclass(model, models.Model):
+                choice_objects[model] = model.objects.in_bulk(pks)
+
+        for obj in records:
+            obj._key_value_choices = choice_objects
+
+
+class CollectionBaseManager(
+    models.Manager.from_queryset(CollectionBaseQuerySet)):
     """
     The manager class for any model that inherits ``CollectionBase``.
     """
@@ -426,9 +873,16 @@ class CollectionBaseManager(models.Manager):
                      turn off sorting, however, if the model sorts this may
                      have no effect.
         :type sort: bool
-        :rtype: A list of tuples suitable for use in HTML select option
-                tags.
+        :rtype: A tuple of tuples suitable for use in HTML select option
+                tags. The result is cached until the model changes.
         """
+        key = (type(self), field, translation.get_language(), bool(active),
+               bool(comment), bool(sort))
+        return choice_index_cache.get_choices(
+            self.model, key,
+            lambda: self._get_choices(field, active, comment, sort))
+
+    def _get_choices(self, field, active, comment, sort):
         choices = [(obj.pk, getattr(obj, field))
                    for obj in self.model_objects(active=active)]
 
@@ -512,12 +966,12 @@ class CollectionBaseManager(models.Manager):
 
 class CollectionBase(TimeModelMixin, UserModelMixin, StatusModelMixin):
     # Some of these values can be a language other than English.
-    YES = _("yes")
-    NO = _("no")
-    YES_NO = (YES, NO, "yes", "no")
-    TRUE = _("true")
-    FALSE = _("false")
-    TRUE_FALSE = (TRUE, FALSE, "true", "false")
+    YES = BooleanCodec.YES
+    NO = BooleanCodec.NO
+    YES_NO = BooleanCodec.YES_NO
+    TRUE = BooleanCodec.TRUE
+    FALSE = BooleanCodec.FALSE
+    TRUE_FALSE = BooleanCodec.TRUE_FALSE
 
     column_collection = models.ForeignKey(
         ColumnCollection, on_delete=models.CASCADE,
@@ -528,6 +982,8 @@ class CollectionBase(TimeModelMixin, UserModelMixin, StatusModelMixin):
     def __init__(self, *args, **kwargs):
         super(CollectionBase, self).__init__(*args, **kwargs)
         self.__save_deferred = []
+        self._key_value_choices = {}
+        self.clear_key_value_cache()
 
     def save(self, *args, **kwargs):
         """
@@ -535,19 +991,142 @@ class CollectionBase(TimeModelMixin, UserModelMixin, StatusModelMixin):
         """
         super(CollectionBase, self).save(*args, **kwargs)
 
-    def serialize_key_values(self, by_slug=False):
+    def refresh_from_db(self, *args, **kwargs):
+        """
+        Reloading the record also drops the ``KeyValue`` snapshot.
+        """
+        super(CollectionBase, self).refresh_from_db(*args, **kwargs)
+        self.clear_key_value_cache()
+
+    @property
+    def kv(self):
+        """
+        Attribute style access to the ``KeyValue`` values of this object.
+        ``book.kv.author`` is the same as ``book.get_key_value('author')``.
+
+        :rtype: ``KeyValueAccessor`` object.
+        """
+        return KeyValueAccessor(self)
+
+    def load_key_values(self, only=None):
+        """
+        Load all the ``KeyValue`` objects and their ``DynamicColumn`` in a
+        single query and keep them on this instance. Later calls to
+        ``get_key_value`` and ``serialize_key_values`` are served from this
+        snapshot. If the ``keyvalues`` were prefetched on the queryset they
+        are used instead and no query is done.
+
+        :param only: Optional list of slugs to limit the query to. If a slug
+                     not in this list is requested later the full snapshot
+                     is loaded.
+        :type only: list, tuple, or None
+        :rtype: A dict of ``{<slug>: <KeyValue object>, ...}``.
+        """
+        only = frozenset(only) if only else None
+
+        if (self._key_value_cache is not None
+            and self._key_value_pk == self.pk):
+            if (self._key_value_only is None
+                or (only and self._key_value_only.issuperset(only))):
+                return self._key_value_cache
+
+            # A partial snapshot cannot answer this request.
+            self.clear_key_value_cache()
+
+        cache = {}
+
+        if self.pk is not None:
+            if 'keyvalues' in getattr(self, '_prefetched_objects_cache', {}):
+                records = self.keyvalues.all()
+                only = None
+            else:
+                records = self.keyvalues.select_related('dynamic_column')
+
+                if only:
+                    records = records.filter(dynamic_column__slug__in=only)
+
+            cache.update({kv.dynamic_column.slug: kv for kv in records})
+
+        self._key_value_cache = cache
+        self._key_value_only = only
+        self._key_value_pk = self.pk
+        return cache
+
+    def clear_key_value_cache(self):
+        """
+        Drop the ``KeyValue`` snapshot, the next access will reload it.
+        """
+        getattr(self, '_prefetched_objects_cache', {}).pop('keyvalues', None)
+        self._key_value_cache = None
+        self._key_value_only = None
+        self._key_value_pk = None
+
+    def _get_key_value_object(self, slug):
+        """
+        Get the ``KeyValue`` object from the snapshot.
+
+        :param slug: The ``DynamicColumn`` slug.
+        :type slug: str
+        :rtype: ``KeyValue`` object or ``None`` if not found.
+        """
+        cache = self._key_value_cache
+
+        if (cache is None or self._key_value_pk != self.pk
+            or (self._key_value_only is not None
+                and slug not in self._key_value_only)):
+            cache = self.load_key_values()
+
+        return cache.get(slug)
+
+    def _key_value_saved(self, obj):
+        """
+        Called when a ``KeyValue`` belonging to this instance was saved or
+        deleted. The snapshot is kept only if it already holds the same
+        object.
+
+        :param obj: The ``KeyValue`` object.
+        :type obj: ``KeyValue`` object
+        """
+        if (self._key_value_cache is not None
+            and not any(kv is obj for kv in self._key_value_cache.values())):
+            self.clear_key_value_cache()
+
+    def serialize_key_values(self, by_slug=False, only=None):
         """
         Returns a dict of the ``DynamicColumn`` PK and the ``KeyValue``
-        value.
+        value. When all the values are requested and no snapshot is loaded
+        the result is served from the key value cache.
 
         :param by_slug: If False a dict of items are keyed by the dynamic
                         column's ``pk``, if True the dynamic column's
                         ``slug`` is used.
         :type by_slug: bool
+        :param only: Optional list of slugs to limit the result to.
+        :type only: list, tuple, or None
+        :rtype: Dict
+        """
+        if (only is None and self.pk is not None
+            and self._key_value_cache is None and not self.__save_deferred):
+            return kv_cache.get_or_set(
+                self.pk, bool(by_slug),
+                lambda: self._serialize_key_values(by_slug))
+
+        return self._serialize_key_values(by_slug, only)
+
+    async def aserialize_key_values(self, by_slug=False, only=None):
+        """
+        The async version of ``serialize_key_values``.
+
+        :param by_slug: See ``serialize_key_values``.
+        :type by_slug: bool
+        :param only: Optional list of slugs to limit the result to.
+        :type only: list, tuple, or None
         :rtype: Dict
         """
-        result = {}
+        return await sync_to_async(self.serialize_key_values)(
+            by_slug=by_slug, only=only)
 
+    def _serialize_key_values(self, by_slug, only=None):
         if by_slug:
             field = 'slug'
         else:
@@ -555,8 +1134,9 @@ class CollectionBase(TimeModelMixin, UserModelMixin, StatusModelMixin):
 
         return {
             getattr(kv.dynamic_column, field):
-            self.get_key_value(kv.dynamic_column.slug, choice_raw=True)
-            for kv in self.keyvalues.select_related('dynamic_column').all()
+            self._decode_key_value(kv, choice_raw=True)
+            for slug, kv in self.load_key_values(only=only).items()
+            if only is None or slug in only
             }
 
     def get_dynamic_column(self, slug):
@@ -571,12 +1151,11 @@ class CollectionBase(TimeModelMixin, UserModelMixin, StatusModelMixin):
         :raises KeyValue.DoesNotExist: If the `KeyValue` model object was not
                                        found.
         """
-        try:
-            dc = self.column_collection.dynamic_column.get(slug=slug)
-        except DynamicColumn.DoesNotExist as e:
+        schema = schema_cache.get_schema_by_pk(self.column_collection_id)
+        dc = schema.by_slug.get(slug) if schema else None
+
+        if dc is None:
             log.error("DynamicColumn with slug '%s' does not exist.", slug)
-            # Cannot get a dynamic column if not in a collection.
-            dc = None
 
         return dc
 
@@ -602,42 +1181,92 @@ class CollectionBase(TimeModelMixin, UserModelMixin, StatusModelMixin):
         :raises AttributeError: If a bad field is passed in.
         :raises TypeError: If wrong type is passed in.
         """
-        try:
-            obj = self.keyvalues.select_related(
-                'dynamic_column').get(dynamic_column__slug=slug)
-        except self.keyvalues.model.DoesNotExist:
+        obj = self._get_key_value_object(slug)
+
+        if obj is None:
             log.error("Could not find value for slug '%s'.", slug)
             value = ''
         else:
-            dc = obj.dynamic_column
-
-            if dc.value_type == dc.CHOICE and obj.value:
-                value = self._is_get_choice(dc, obj.value, field, choice_raw)
-            elif dc.value_type == dc.TIME and obj.value:
-                value = self._is_get_time(dc, obj.value)
-            elif dc.value_type == dc.DATE and obj.value:
-                value = self._is_get_date(dc, obj.value)
-            elif dc.value_type == dc.DATETIME and obj.value:
-                value = self._is_get_datetime(dc, obj.value)
-            elif dc.value_type == dc.BOOLEAN and obj.value:
-                value = self._is_get_boolean(dc, obj.value)
-            elif dc.value_type == dc.NUMBER and obj.value:
-                value = self._is_get_number(dc, obj.value)
-            elif dc.value_type == dc.FLOAT and obj.value:
-                value = self._is_get_float(dc, obj.value)
-            elif dc.value_type in (dc.TEXT, dc.TEXT_BLOCK) and obj.value:
-                value = obj.value
-            else: # pragma: no cover
-                # This should never happen. An invalid value_type will
-                # raise a ValidationError when the DynamicColumn is
-                # created.
-                value = obj.value
+            value = self._decode_key_value(obj, field, choice_raw)
+
+        return value
+
+    async def aget_key_value(self, slug, field=None, choice_raw=False):
+        """
+        The async version of ``get_key_value``.
+
+        :param slug: The ``DynamicColumn`` slug.
+        :type slug: str
+        :param field: See ``get_key_value``.
+        :type field: str or None
+        :param choice_raw: See ``get_key_value``.
+        :type choice_raw: bool
+        :rtype: String value from a ``KeyValue`` object.
+        """
+        return await sync_to_async(self.get_key_value)(
+            slug, field=field, choice_raw=choice_raw)
+
+    def get_key_values(self, slugs, field=None, choice_raw=False):
+        """
+        Return the values of several ``DynamicColumn`` slugs. The
+        ``KeyValue`` objects are loaded in one query, or none if they were
+        prefetched with ``with_key_values``.
+
+        :param slugs: The ``DynamicColumn`` slugs.
+        :type slugs: list or tuple
+        :param field: See ``get_key_value``.
+        :type field: str or None
+        :param choice_raw: See ``get_key_value``.
+        :type choice_raw: bool
+        :rtype: An OrderedDict of ``{<slug>: <value>, ...}`` in the order
+                of ``slugs``.
+        """
+        self.load_key_values(only=slugs)
+        return OrderedDict((slug, self.get_key_value(slug, field, choice_raw))
+                           for slug in slugs)
+
+    def _decode_key_value(self, obj, field=None, choice_raw=False):
+        """
+        Convert the ``KeyValue`` text value to the type of its
+        ``DynamicColumn``.
+
+        :param obj: A ``KeyValue`` object with its ``DynamicColumn``.
+        :type obj: ``KeyValue`` object
+        :param field: See ``get_key_value``.
+        :type field: str or None
+        :param choice_raw: See ``get_key_value``.
+        :type choice_raw: bool
+        :rtype: The converted value.
+        """
+        dc = obj.dynamic_column
+        typed = obj.get_typed_value()
+
+        if typed is not None:
+            value = typed
+        elif not obj.value:
+            value = obj.value
+        elif dc.value_type == dc.CHOICE:
+            value = self._is_get_choice(dc, obj.value, field, choice_raw)
+        else:
+            value = self._decode_value(dc, obj.value)
 
         return value
 
+    def _decode_value(self, dc, value):
+        try:
+            return codec_registry.get(dc.value_type).decode(value)
+        except ValueError as e:
+            self._raise_exception(dc, value, except_msg=e)
+
+    def _encode_value(self, dc, value, field='(Not applicable)'):
+        try:
+            return codec_registry.get(dc.value_type).encode(value)
+        except ValueError as e:
+            self._raise_exception(dc, value, field=field, except_msg=e)
+
     def _is_get_choice(self, dc, value, field, choice_raw):
         if dc.store_relation or choice_raw:
-            result = int(value) if value.isdigit() else value
+            result = self._decode_value(dc, value)
         else:
             model, m_field = dc.get_choice_relation_object_and_field()
 
@@ -645,70 +1274,185 @@ class CollectionBase(TimeModelMixin, UserModelMixin, StatusModelMixin):
                 field = m_field
 
             if model and field: # value should be a pk--str(pk)
-                result = model.objects.get_value_by_pk(value, field)
+                choice = self._key_value_choices.get(model, {}).get(
+                    int(value) if value.isdigit() else None)
+
+                if choice is not None: # Prefetched by with_key_values.
+                    result = getattr(choice, field)
+                else:
+                    result = model.objects.get_value_by_pk(value, field)
             else: # pragma: no cover
                 self._raise_exception(dc, value, field=field)
 
         return result
 
-    def _is_get_time(self, dc, value):
-        dt = self._is_get_datetime(dc, value)
-        return datetime.time(
-            hour=dt.hour, minute=dt.minute, second=dt.second,
-            microsecond=dt.microsecond, tzinfo=dt.tzinfo)
+    def save_deferred(self):
+        """
+        Save the ``KeyValue`` objects deferred by ``set_key_value``. Only
+        the objects whose value differs from the value loaded from the
+        database are written. They are validated against the in-memory
+        schema, then all new objects are inserted with one ``bulk_create``
+        and all existing objects are updated with one ``bulk_update`` in a
+        single transaction. One ``key_values_changed`` signal is sent with
+        the changed slugs.
+
+        :raises ValidationError: If a ``KeyValue`` object is not valid.
+        """
+        creates = []
+        updates = []
+        seen = set()
 
-    def _is_get_date(self, dc, value):
-        dt = self._is_get_datetime(dc, value)
-        return datetime.date(year=dt.year, month=dt.month, day=dt.day)
+        for obj in self.__save_deferred:
+            # The same object is deferred again when a slug is set twice.
+            if id(obj) in seen or not obj.has_changed(): continue
+            seen.add(id(obj))
+            obj.collection = self
+            obj.set_typed_values()
+            self._validate_deferred(obj)
 
-    def _is_get_datetime(self, dc, value):
-        try:
-            return parser.parse(value)
-        except ValueError:
-            self._raise_exception(dc, value)
-
-    def _is_get_boolean(self, dc, value):
-        if value.isdigit():
-            result = 0 if int(value) == 0 else 1
-        elif value.lower() in self.TRUE_FALSE:
-            result = value.lower() in (self.TRUE, 'true')
-        elif value.lower() in self.YES_NO:
-            result = value.lower() in (self.YES, 'yes')
-        else:
-            self._raise_exception(dc, value)
+            if obj.pk is None:
+                creates.append(obj)
+            else:
+                updates.append(obj)
 
-        return result
+        if creates or updates:
+            with transaction.atomic():
+                if creates:
+                    KeyValue.objects.bulk_create(creates)
 
-    def _is_get_number(self, dc, value):
-        if value.isdigit():
-            result = int(value)
-        else:
-            self._raise_exception(dc, value)
+                if updates:
+                    KeyValue.objects.bulk_update(
+                        updates, ('value',) + KeyValue.TYPED_FIELDS)
 
-        return result
+        log.debug("Deferred KeyValue objects created: %s, updated: %s, "
+                  "unchanged: %s", len(creates), len(updates),
+                  len(self.__save_deferred) - len(creates) - len(updates))
+        self.__save_deferred[:] = []
+        self.clear_key_value_cache()
 
-    def _is_get_float(self, dc, value):
-        if value.replace('.', '').isdigit():
-            result = float(value)
-        else:
-            self._raise_exception(dc, value)
+        if creates or updates:
+            for obj in creates + updates:
+                obj._loaded_value = obj.value
 
-        return result
+            # The bulk queries do not send the KeyValue signals.
+            self._send_key_values_changed(
+                obj.dynamic_column.slug for obj in creates + updates)
 
-    def save_deferred(self):
-        for obj in self.__save_deferred:
-            obj.collection = self
-            obj.save()
+    def _send_key_values_changed(self, slugs):
+        """
+        Send the ``key_values_changed`` signal for this object.
+
+        :param slugs: The slugs of the changed values.
+        :type slugs: iterable
+        """
+        key_values_changed.send(sender=self.__class__, instance=self,
+                                slugs=frozenset(slugs))
+
+    def discard_deferred(self):
+        """
+        Drop the ``KeyValue`` objects deferred by ``set_key_value`` without
+        saving them. The snapshot holds the deferred values so it is
+        dropped too, the next access reloads it.
+        """
+        self.__save_deferred[:] = []
+        self.clear_key_value_cache()
+
+    def _validate_deferred(self, obj):
+        """
+        Validate a ``KeyValue`` object without the database queries done by
+        ``full_clean``. The ``DynamicColumn`` has already been found in
+        this collection's schema by ``set_key_value``.
+
+        :param obj: The ``KeyValue`` object.
+        :type obj: ``KeyValue`` object
+        :raises ValidationError: If the object is not valid.
+        """
+        if self.pk is None or obj.dynamic_column_id is None:
+            msg = _("A KeyValue must have a saved collection and a dynamic "
+                    "column, found collection: {}, dynamic column: {}."
+                    ).format(self.pk, obj.dynamic_column_id)
+            log.error(msg)
+            raise ValidationError(msg)
+
+        obj.clean_fields(exclude=('collection', 'dynamic_column'))
+
+    def increment_key_value(self, slug, delta=1):
+        """
+        Atomically add ``delta`` to a ``NUMBER`` value in the database.
+        The arithmetic is done in a single UPDATE statement so concurrent
+        callers never lose an update. If the ``KeyValue`` object does not
+        exist yet it is created with ``delta`` as its value.
+
+        :param slug: The slug associated with a ``KeyValue`` object.
+        :type slug: str
+        :param delta: The amount to add, can be negative. The default is 1.
+        :type delta: int
+        :rtype: The new value as an ``int``.
+        :raises ValueError: If the slug is not a ``NUMBER`` column or
+                            ``delta`` is not an integer.
+        """
+        dc = self.get_dynamic_column(slug)
+
+        if not dc or dc.value_type != dc.NUMBER:
+            msg = "Could not find a NUMBER DynamicColumn for slug '{}'.".format(
+                slug)
+            log.error(msg)
+            raise ValueError(msg)
+
+        if isinstance(delta, bool) or not isinstance(delta, int):
+            msg = "The delta '{}' must be an integer.".format(delta)
+            log.error(msg)
+            raise ValueError(msg)
+
+        queryset = KeyValue.objects.filter(collection=self, dynamic_column=dc)
+        # An empty value counts as zero.
+        number = Coalesce(Cast(NullIf('value', models.Value('')),
+                               models.BigIntegerField()), models.Value(0))
+        expressions = {'value': Cast(number + delta, models.CharField()),
+                       'int_value': number + delta}
+
+        with transaction.atomic():
+            if not queryset.update(**expressions):
+                try:
+                    with transaction.atomic():
+                        KeyValue.objects.create(
+                            collection=self, dynamic_column=dc,
+                            value=str(delta))
+                except IntegrityError:
+                    # Another process created the row first.
+                    queryset.update(**expressions)
+
+            obj = queryset.select_related('dynamic_column').get()
+
+        obj.collection = self
+        self.load_key_values()[dc.slug] = obj
+        self._send_key_values_changed((dc.slug,))
+        return int(obj.value)
+
+    def next_sequence(self, slug):
+        """
+        Return the next number of a counter kept in a ``NUMBER`` column.
+        This can be used for things like SKU numbers, every caller gets a
+        unique value even when called concurrently.
+
+        :param slug: The slug associated with a ``KeyValue`` object.
+        :type slug: str
+        :rtype: The next value as an ``int``.
+        """
+        return self.increment_key_value(slug)
 
     def set_key_value(self, slug, value, field=None, obj=None, force=False,
-                      defer=False):
+                      defer=False, delta=1):
         """
         This method sets an arbitrary key/value object, it will create a
         new objects or updated a pre-existing object.
 
         If the argument ``value`` contains the value 'increment' or
         'decrement' the value associated with the slug will be
-        incremented or decremented.
+        incremented or decremented by ``delta`` with
+        ``increment_key_value``. If ``defer`` is ``True`` the new value
+        is calculated from the current value and saved later, this is not
+        atomic.
 
         :param slug: The slug associated with a ``KeyValue`` object.
         :type slug: str
@@ -728,58 +1472,62 @@ class CollectionBase(TimeModelMixin, UserModelMixin, StatusModelMixin):
                       ``True`` save empty strings only.
         :type force: bool
         :param defer: Defer saving the KeyValue record. ``False`` is
-                      default.
+                      default. A value equal to the stored value is not
+                      saved again.
         :type defer: bool
+        :param delta: The amount used by 'increment' and 'decrement'. The
+                      default is 1.
+        :type delta: int
         :raises ValueError: Invalid combination of parameters.
         :raises KeyValue.DoesNotExist: If the `KeyValue` model object was
                                        not found.
         """
         if (force and value == '') or value not in (None, ''):
             dc = self.get_dynamic_column(slug)
+            step = None
 
             if dc:
                 if dc.value_type == dc.CHOICE:
                     value = self._is_set_choice(dc, value, field)
-                elif dc.value_type in (dc.TIME, dc.DATE, dc.DATETIME):
-                    value = self._is_set_datetime(dc, value)
                 elif (dc.value_type == dc.NUMBER and
                       value in ('increment', 'decrement')):
-                    pass
-                elif dc.value_type == dc.BOOLEAN:
-                    value = self._is_set_boolean(dc, value)
-                elif dc.value_type == dc.FLOAT:
-                    value = self._is_set_float(dc, value)
-                elif dc.value_type == dc.NUMBER:
-                    value = self._is_set_number(dc, value)
-                elif (dc.value_type in (dc.TEXT, dc.TEXT_BLOCK) and
-                      isinstance(value, str)):
-                    pass
-                else: # pragma: no cover
-                    # This should never happen. An invalid value_type
-                    # will raise a ValidationError when the DynamicColumn
-                    # is created.
-                    self._raise_exception(dc, value)
-
-                created = False
+                    step = delta if value == 'increment' else -delta
+
+                    if not defer:
+                        self.increment_key_value(dc.slug, step)
+                        return
+                else:
+                    value = self._encode_value(dc, value)
 
                 if not obj:
-                    try:
-                        obj = self.keyvalues.get(collection=self,
-                                                 dynamic_column=dc)
-                    except (ValueError, KeyValue.DoesNotExist):
+                    obj = self._get_key_value_object(dc.slug)
+
+                    if obj is None:
                         obj = KeyValue(collection=self, dynamic_column=dc)
-                    else:
-                        if 'increment' == value and obj.value.isdigit():
-                            value = str(int(obj.value) + 1)
-                        elif 'decrement' == value and obj.value.isdigit():
-                            value = str(int(obj.value) - 1)
 
-                obj.value = value
+                if step is not None:
+                    try:
+                        value = str(int(obj.value or 0) + step)
+                    except (TypeError, ValueError) as e:
+                        msg = ("Could not {} the value '{}' of the "
+                               "DynamicColumn '{}', {}").format(
+                            'increment' if step > 0 else 'decrement',
+                            obj.value, dc.slug, e)
+                        log.error(msg)
+                        raise ValueError(msg)
+
+                obj.value = str(value)
+                # The typed columns are read first so they must match a
+                # deferred value.
+                obj.set_typed_values()
+                # Keep the snapshot current with the new or deferred value.
+                self.load_key_values()[dc.slug] = obj
 
                 if defer:
                     self.__save_deferred.append(obj)
-                else:
+                elif obj.has_changed():
                     obj.save()
+                    self._send_key_values_changed((dc.slug,))
             else:
                 msg = "Could not find DynamicColumn for slug '{}'.".format(
                     slug)
@@ -792,6 +1540,20 @@ class CollectionBase(TimeModelMixin, UserModelMixin, StatusModelMixin):
             log.error(msg)
             raise ValueError(msg)
 
+    async def aset_key_value(self, slug, value, field=None, obj=None,
+                             force=False, defer=False, delta=1):
+        """
+        The async version of ``set_key_value``, the arguments are the same.
+
+        :param slug: The slug associated with a ``KeyValue`` object.
+        :type slug: str
+        :param value: See ``set_key_value``.
+        :type value: string or CollectionBase object
+        """
+        await sync_to_async(self.set_key_value)(
+            slug, value, field=field, obj=obj, force=force, defer=defer,
+            delta=delta)
+
     def _is_set_choice(self, dc, value, field):
         model, m_field = dc.get_choice_relation_object_and_field()
 
@@ -802,81 +1564,52 @@ class CollectionBase(TimeModelMixin, UserModelMixin, StatusModelMixin):
             result = getattr(value, field)
         elif isinstance(value, (CollectionBase, BaseChoice)): # Normal mode
             result = getattr(value, 'pk')
-        elif isinstance(value, str):
-            if value.isdigit() or value == '':
-                result = value
-            else:
-                self._raise_exception(dc, value, field=field)
-        elif isinstance(value, int):
-            result = str(value)
-        else: # pragma: no cover
-            self._raise_exception(dc, value, field=field)
+        else:
+            result = self._encode_value(dc, value, field=field)
 
         return result
 
-    def _is_set_datetime(self, dc, value):
-        if isinstance(value, (datetime.time, datetime.date,
-                              datetime.datetime)):
-            result = value.isoformat()
-        elif isinstance(value, str):
-            try:
-                dt = parser.parse(value)
-            except ValueError as e:
-                self._raise_exception(dc, value, except_msg=e)
-            else:
-                result = value
-        else:
-            self._raise_exception(dc, value)
+    def _raise_exception(self, dc, value, field='(Not applicable)',
+                         except_msg=''):
+        msg = _("Invalid value {}, should be of type {}, with field: {}, "
+                "{}.").format(value, codec_registry.get_label(
+            dc.value_type), field, except_msg)
+        log.error(msg)
+        raise ValueError(msg)
 
-        return result
 
-    def _is_set_boolean(self, dc, value):
-        if isinstance(value, bool):
-            result = str(value)
-        elif isinstance(value, int):
-            result = str(0 if value == 0 else 1)
-        elif isinstance(value, str):
-            if (value.lower() in self.TRUE_FALSE or
-                value.lower() in self.YES_NO):
-                result = value
-            elif value.isdigit():
-                result = str(0 if int(value) == 0 else 1)
-            else:
-                self._raise_exception(dc, value)
-        else:
-            self._raise_exception(dc, value)
+class KeyValueAccessor(object):
+    """
+    Gives attribute and item access to the ``KeyValue`` values of a model
+    that inherits ``CollectionBase``. The values come from the snapshot on
+    the instance so only the first access does a query.
 
-        return result
+    Example::
 
-    def _is_set_float(self, dc, value):
-        if isinstance(value, float):
-            result = str(value)
-        elif isinstance(value, int):
-            result = str(float(value))
-        elif isinstance(value, str) and value.replace('.', '').isdigit():
-            result = str(float(value))
-        else:
-            self._raise_exception(dc, value)
+      book.kv.author
+      book.kv['author']
 
-        return result
+      In a template:
+      {{ book.kv.author }}
+    """
 
-    def _is_set_number(self, dc, value):
-        if isinstance(value, int):
-            result = str(value)
-        elif isinstance(value, str) and value.isdigit():
-            result = value
-        else:
-            self._raise_exception(dc, value)
+    def __init__(self, instance):
+        self._instance = instance
 
-        return result
+    def __getattr__(self, slug):
+        if slug.startswith('_'):
+            raise AttributeError(slug)
 
-    def _raise_exception(self, dc, value, field='(Not applicable)',
-                         except_msg=''):
-        msg = _("Invalid value {}, should be of type {}, with field: {}, "
-                "{}.").format(value, DynamicColumn.VALUE_TYPES_MAP.get(
-            dc.value_type), field, except_msg)
-        log.error(msg)
-        raise ValueError(msg)
+        return self._instance.get_key_value(slug)
+
+    def __getitem__(self, slug):
+        return self._instance.get_key_value(slug)
+
+    def __contains__(self, slug):
+        return self._instance._get_key_value_object(slug) is not None
+
+    def __iter__(self):
+        return iter(self._instance.load_key_values())
 
 
 #
@@ -886,6 +1619,18 @@ class KeyValueManager(models.Manager):
     pass
 
 
+_VALUE_INDEX_LENGTH = 255
+
+
+def _value_prefix():
+    """
+    The start of the ``KeyValue`` value that is indexed. A whole
+    ``TEXT_BLOCK`` value can be too long for a database index.
+    """
+    return Cast(Substr('value', 1, _VALUE_INDEX_LENGTH),
+                models.CharField(max_length=_VALUE_INDEX_LENGTH))
+
+
 class KeyValue(ValidateOnSaveMixin):
     collection = models.ForeignKey(
         CollectionBase, on_delete=models.CASCADE,
@@ -894,9 +1639,117 @@ class KeyValue(ValidateOnSaveMixin):
         DynamicColumn, on_delete=models.CASCADE,
         verbose_name=_("Dynamic Column"), related_name='keyvalues')
     value = models.TextField(verbose_name=_("Value"), null=True, blank=True)
+    int_value = models.BigIntegerField(
+        verbose_name=_("Integer Value"), null=True, blank=True,
+        editable=False)
+    float_value = models.FloatField(
+        verbose_name=_("Float Value"), null=True, blank=True,
+        editable=False)
+    datetime_value = models.DateTimeField(
+        verbose_name=_("Date Time Value"), null=True, blank=True,
+        editable=False)
+    bool_value = models.BooleanField(
+        verbose_name=_("Boolean Value"), null=True, blank=True,
+        editable=False)
 
     objects = KeyValueManager()
 
+    TYPED_FIELDS = ('int_value', 'float_value', 'datetime_value',
+                    'bool_value')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Keep the value loaded from the database for ``has_changed``.
+        """
+        instance = super(KeyValue, cls).from_db(db, field_names, values)
+        instance._loaded_value = instance.__dict__.get('value')
+        return instance
+
+    def has_changed(self):
+        """
+        Check if the value differs from the value loaded from or last saved
+        to the database. New objects have always changed.
+
+        :rtype: bool
+        """
+        if self.pk is None or not hasattr(self, '_loaded_value'):
+            return True
+
+        value, loaded = self.value, self._loaded_value
+        return (value is None) != (loaded is None) or str(value) != str(loaded)
+
+    def set_typed_values(self):
+        """
+        Fill the typed columns from the text ``value`` as per the
+        ``value_type`` of the ``DynamicColumn``. The text stays the source
+        of record, a value that cannot be converted leaves the typed
+        columns empty. ``TIME`` values and naive ``DATETIME`` values are
+        not stored in ``datetime_value`` since the database would change
+        them to another time zone.
+        """
+        for field in self.TYPED_FIELDS:
+            setattr(self, field, None)
+
+        if self.value in (None, ''):
+            return
+
+        dc = self.dynamic_column
+        value = str(self.value)
+
+        try:
+            if dc.value_type == dc.NUMBER:
+                number = codec_registry.get(dc.NUMBER).decode(value)
+
+                # Larger numbers do not fit in a BigIntegerField.
+                if abs(number) < 2 ** 63:
+                    self.int_value = number
+            elif dc.value_type == dc.FLOAT:
+                self.float_value = codec_registry.get(dc.FLOAT).decode(value)
+            elif dc.value_type == dc.BOOLEAN:
+                self.bool_value = bool(
+                    codec_registry.get(dc.BOOLEAN).decode(value))
+            elif dc.value_type == dc.DATE:
+                dt = datetime.datetime.combine(
+                    codec_registry.get(dc.DATE).decode(value),
+                    datetime.time())
+
+                if settings.USE_TZ:
+                    dt = timezone.make_aware(dt, datetime.timezone.utc)
+
+                self.datetime_value = dt
+            elif dc.value_type == dc.DATETIME:
+                dt = codec_registry.get(dc.DATETIME).decode(value)
+
+                if timezone.is_aware(dt) == settings.USE_TZ:
+                    self.datetime_value = dt
+        except ValueError as e:
+            log.warning("Could not convert '%s' for DynamicColumn '%s', %s",
+                        value, dc.slug, e)
+
+    def get_typed_value(self):
+        """
+        Get the value from the typed column for the ``value_type`` of the
+        ``DynamicColumn``. ``BOOLEAN`` values are still read from the text
+        since numbers and words are returned as they were stored, and
+        ``DATETIME`` values since the database does not keep their UTC
+        offset.
+
+        :rtype: The value or ``None`` if the typed column is empty.
+        """
+        dc = self.dynamic_column
+
+        if dc.value_type == dc.NUMBER:
+            value = self.int_value
+        elif dc.value_type == dc.FLOAT:
+            value = self.float_value
+        elif dc.value_type == dc.DATE and self.datetime_value is not None:
+            value = self.datetime_value.date()
+        else:
+            value = None
+
+        return value
+
     def save(self, *args, **kwargs):
         """
         Be sure the complete MRO has their saves called.
@@ -904,7 +1757,21 @@ class KeyValue(ValidateOnSaveMixin):
         log.debug("KeyValue pk: %s,  collection: %s, dynamic_column: %s, "
                   "value: %s, args: %s, kwargs: %s", self.pk, self.collection,
                   self.dynamic_column, self.value, args, kwargs)
+        self.set_typed_values()
         super(KeyValue, self).save(*args, **kwargs)
+        self._loaded_value = self.value
+
+        if KeyValue.collection.is_cached(self):
+            self.collection._key_value_saved(self)
+
+    def delete(self, *args, **kwargs):
+        """
+        Drop the ``KeyValue`` snapshot on the collection if we have it.
+        """
+        if KeyValue.collection.is_cached(self):
+            self.collection.clear_key_value_cache()
+
+        return super(KeyValue, self).delete(*args, **kwargs)
 
     def __str__(self):
         return self.dynamic_column.name
@@ -913,3 +1780,12 @@ class KeyValue(ValidateOnSaveMixin):
         ordering = ('dynamic_column__location', 'dynamic_column__order',)
         verbose_name = _("Key Value")
         verbose_name_plural = _("Key Values")
+        constraints = [
+            models.UniqueConstraint(
+                fields=('collection', 'dynamic_column'),
+                name='dcolumns_keyvalue_unique_collection_column'),
+            ]
+        indexes = [
+            models.Index(models.F('dynamic_column'), _value_prefix(),
+                         name='dcolumns_kv_column_value_idx'),
+            ]
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+#
+# dcolumn/dcolumns/schema.py
+#
+
+"""
+An in-process cache of the ``ColumnCollection`` and ``DynamicColumn``
+objects. The schema almost never changes so it is compiled once and kept
+until a signal reports a change. Other processes learn about a change
+from a version number kept in the Django cache.
+"""
+__docformat__ = "restructuredtext en"
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.db import transaction
+
+from .manager import dcolumn_manager
+
+log = logging.getLogger('dcolumns.dcolumns.schema')
+
+
+class CollectionSchema(object):
+    """
+    The compiled schema of one ``ColumnCollection``. The objects in it are
+    shared between requests and must be treated as read only.
+    """
+
+    def __init__(self, collection, columns):
+        """
+        Constructor.
+
+        :param collection: The ``ColumnCollection`` object.
+        :type collection: ColumnCollection
+        :param columns: All the ``DynamicColumn`` objects of the collection
+                        in their normal order.
+        :type columns: list
+        """
+        self.collection = collection
+        self.columns = tuple(columns)
+        self.active_columns = tuple(dc for dc in self.columns if dc.active)
+        self.by_slug = {dc.slug: dc for dc in self.columns}
+        self.by_pk = {dc.pk: dc for dc in self.columns}
+        self.relations = OrderedDict()
+        self.locations = OrderedDict()
+
+        for dc in self.active_columns:
+            self.locations.setdefault(dc.location, []).append(dc)
+
+            if dc.value_type == dc.CHOICE:
+                self.relations[dc.slug] = (
+                    dc.get_choice_relation_object_and_field())
+
+    def __repr__(self):
+        return "<CollectionSchema: {}>".format(self.collection)
+
+
+class SchemaCache(object):
+    """
+    Holds the ``CollectionSchema`` objects keyed by the collection `pk`
+    and by the name (the ``related_model``) of the active collections.
+    The generation is bumped on every ``clear``, a result loaded before a
+    ``clear`` is returned but not stored.
+    """
+
+    VERSION_KEY = 'dcolumns:schema-version'
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._version = None
+        self._generation = 0
+        self.clear()
+
+    def clear(self):
+        """
+        Drop everything, the schema is reloaded on the next lookup.
+        """
+        with self._lock:
+            self._by_pk = {}
+            self._by_name = {}
+            self._fk_slugs = None
+            self._generation += 1
+
+    def get_schema(self, name):
+        """
+        Get the schema of the active collection with this name.
+
+        :param name: Name of the collection, the same name passed to
+                     ``ColumnCollection.objects.get_column_collection``.
+        :type name: str
+        :rtype: A ``CollectionSchema`` object.
+        :raises ColumnCollection.DoesNotExist: If the collection is not
+                                               found.
+        """
+        from .models import ColumnCollection
+        key = name.lower()
+
+        with self._lock:
+            generation = self._generation
+            found = key in self._by_name
+            pk = self._by_name.get(key)
+            schema = self._by_pk.get(pk)
+
+        if not found:
+            obj = ColumnCollection.objects.active().filter(
+                related_model__iexact=name).first()
+            pk = obj.pk if obj else None
+            schema = self._store(generation, obj)
+
+            with self._lock:
+                if generation == self._generation:
+                    self._by_name[key] = pk
+
+        if pk is None:
+            raise ColumnCollection.DoesNotExist(
+                "ColumnCollection matching query does not exist.")
+
+        return schema or self.get_schema_by_pk(pk)
+
+    def get_schema_by_pk(self, pk):
+        """
+        Get the schema of the collection with this `pk`, the collection
+        does not need to be active.
+
+        :param pk: The ``ColumnCollection`` `pk`.
+        :type pk: int
+        :rtype: A ``CollectionSchema`` object or ``None`` if not found.
+        """
+        from .models import ColumnCollection
+
+        with self._lock:
+            generation = self._generation
+            found = pk in self._by_pk
+            schema = self._by_pk.get(pk)
+
+        if not found:
+            schema = self._store(
+                generation, ColumnCollection.objects.filter(pk=pk).first(), pk)
+
+        return schema
+
+    def get_fk_slugs(self):
+        """
+        See ``DynamicColumn.objects.get_fk_slugs``.
+
+        :rtype: A dict of ``{<relation class name>: <slug>, ...}``.
+        """
+        from .models import DynamicColumn
+
+        with self._lock:
+            generation = self._generation
+            result = self._fk_slugs
+
+        if result is None:
+            result = {}
+
+            for record in DynamicColumn.objects.active().filter(
+                value_type=DynamicColumn.CHOICE):
+                name = dcolumn_manager.choice_relation_map.get(
+                    record.relation)
+                result[name] = record.slug
+
+            with self._lock:
+                if generation == self._generation:
+                    self._fk_slugs = result
+
+        return dict(result)
+
+    def _store(self, generation, obj, pk=None):
+        schema = None
+
+        if obj:
+            pk = obj.pk
+            schema = CollectionSchema(obj, obj.dynamic_column.all())
+            log.debug("Compiled %r", schema)
+
+        if pk is not None:
+            with self._lock:
+                # A clear while the schema was loaded means it may be old.
+                if generation == self._generation:
+                    self._by_pk[pk] = schema
+
+        return schema
+
+    @property
+    def version(self):
+        """
+        The schema version this process last saw. Other caches of schema
+        data can compare it to decide when to reload.
+
+        :rtype: int or None
+        """
+        return self._version
+
+    def get_version(self):
+        """
+        Get the shared schema version from the Django cache. If it is
+        missing, it is seeded with the current time in milliseconds so a
+        lost key never brings back an old version.
+
+        :rtype: int
+        """
+        cache = caches[dcolumn_manager.cache_alias]
+        version = cache.get(self.VERSION_KEY)
+
+        if version is None:
+            cache.add(self.VERSION_KEY, int(time.time() * 1000), None)
+            version = cache.get(self.VERSION_KEY)
+
+        return version
+
+    def bump_version(self):
+        """
+        Increment the shared schema version so every process reloads its
+        schema.
+
+        :rtype: int
+        """
+        cache = caches[dcolumn_manager.cache_alias]
+
+        try:
+            version = cache.incr(self.VERSION_KEY)
+        except ValueError:
+            # The key was evicted, the time is larger than any old version.
+            version = int(time.time() * 1000)
+            cache.set(self.VERSION_KEY, version, None)
+
+        return version
+
+    def revalidate(self, **kwargs):
+        """
+        Signal receiver called at the start of each request. One read of
+        the shared version, the cache is cleared if another process
+        changed the schema.
+        """
+        version = self.get_version()
+
+        if version != self._version:
+            if self._version is not None:
+                log.debug("Schema version changed from %s to %s.",
+                          self._version, version)
+
+            self.clear()
+            self._version = version
+
+    def invalidate(self, **kwargs):
+        """
+        Signal receiver that clears the cache and bumps the shared version.
+        This is done again when the transaction commits so a request that
+        read the old schema before the commit cannot leave it in a cache.
+        """
+        self._changed()
+        transaction.on_commit(self._changed)
+
+    def _changed(self):
+        self.clear()
+        self._version = self.bump_version()
+
+
+schema_cache = SchemaCache()
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+#
+# dcolumn/dcolumns/signals.py
+#
+
+"""
+Dynamic Column signals.
+"""
+__docformat__ = "restructuredtext en"
+
+from django.dispatch import Signal
+
+
+#
+# key_values_changed
+#
+# Sent once after the KeyValue objects of a CollectionBase object were
+# written by set_key_value, save_deferred or increment_key_value, only
+# when a value really changed.
+#
+# sender    -- The model class of the CollectionBase object.
+# instance  -- The CollectionBase object.
+# slugs     -- A frozenset of the slugs of the changed values.
+#
+key_values_changed = Signal()
@@ -0,0 +1,95 @@
+/*
+ * autocomplete.js
+ *
+ * Turns the inputs rendered by the auto_display tag with the autocomplete
+ * keyword into autocomplete widgets. The options are fetched from the
+ * api-choices endpoint a page at a time as the user types.
+ */
+
+"use strict";
+
+(function() {
+  var DELAY = 250;
+  var LIMIT = 20;
+
+  var Autocomplete = function(input) {
+    this.input = input;
+    this.target = document.getElementById(input.dataset.target);
+    this.url = input.dataset.url;
+    this.timer = null;
+    this.list = document.createElement('ul');
+    this.list.className = 'dcolumn-autocomplete-list';
+    this.list.hidden = true;
+    input.parentNode.insertBefore(this.list, input.nextSibling);
+    input.addEventListener('input', this._onInput.bind(this));
+    input.addEventListener('blur', this._onBlur.bind(this));
+  };
+
+  Autocomplete.prototype._onInput = function() {
+    clearTimeout(this.timer);
+    this.target.value = 0;
+    this.list.innerHTML = '';
+    this.timer = setTimeout(this._fetch.bind(this, null), DELAY);
+  };
+
+  Autocomplete.prototype._onBlur = function() {
+    // Let a click on an option finish first.
+    setTimeout(function() { this.list.hidden = true; }.bind(this), 200);
+  };
+
+  Autocomplete.prototype._fetch = function(cursor) {
+    var params = new URLSearchParams({q: this.input.value, limit: LIMIT});
+
+    if(cursor !== null) {
+      params.set('cursor', cursor);
+    }
+
+    fetch(this.url + '?' + params.toString(), {credentials: 'same-origin'})
+      .then(function(response) { return response.json(); })
+      .then(this._show.bind(this));
+  };
+
+  Autocomplete.prototype._show = function(data) {
+    var more = this.list.querySelector('.more');
+
+    if(more !== null) {
+      this.list.removeChild(more);
+    }
+
+    if(!data.valid) {
+      return;
+    }
+
+    data.results.forEach(function(item) {
+      var li = document.createElement('li');
+      li.textContent = item[1];
+      li.addEventListener('mousedown', function() {
+        this.target.value = item[0];
+        this.input.value = item[1];
+        this.list.hidden = true;
+      }.bind(this));
+      this.list.appendChild(li);
+    }, this);
+
+    if(data.next !== null) {
+      more = document.createElement('li');
+      more.className = 'more';
+      more.textContent = '...';
+      more.addEventListener('mousedown', function(event) {
+        event.preventDefault();
+        this._fetch(data.next);
+      }.bind(this));
+      this.list.appendChild(more);
+    }
+
+    this.list.hidden = this.list.children.length === 0;
+  };
+
+  document.addEventListener('DOMContentLoaded', function() {
+    var inputs = document.querySelectorAll('input.dcolumn-autocomplete');
+
+    for(var i = 0; i < inputs.length; i++) {
+      new Autocomplete(inputs[i]);
+    }
+  });
+})();
@@ -8,19 +8,20 @@ Template tags used for displaying dynamic columns.
 """
 __docformat__ = "restructuredtext en"
 
-import io
-import os
 import logging
 import types
 import datetime
 from dateutil import parser
 
 from django import template
+from django.urls import reverse
+from django.utils.html import conditional_escape, escape
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext, gettext_lazy as _
 
 from dcolumn.dcolumns.models import DynamicColumn, KeyValue
 from dcolumn.dcolumns.manager import dcolumn_manager
+from dcolumn.dcolumns.choice_index import choice_index_cache
 
 log = logging.getLogger('dcolumns.dcolumns.templatetags')
 register = template.Library()
@@ -46,6 +47,11 @@ def auto_display(parser, token):
                   or just the object for this relation.
       display  -- A keyword argument. If 'True' use <span> for all tags else
                   'False' use the default tag types.
+      autocomplete -- A keyword argument who's value is the collection name
+                  (the class_name of the AJAX API). CHOICE fields are
+                  rendered as autocomplete widgets that search the options
+                  with the API instead of as select tags with all the
+                  options, 'options' is not needed for them.
 
     Assume data structures below for examples::
 
@@ -82,38 +88,121 @@ def auto_display(parser, token):
       {% auto_display relation options=books display=True %}
 
       {% auto_display relation prefix=test- options=dynamicColumns %}
+
+      {% auto_display relation options=dynamicColumns autocomplete=book %}
     """
     tokens = token.split_contents()
+    kwargs = _parse_keywords(tokens, 2, {
+        'prefix': '', 'options': None, 'display': 'False',
+        'autocomplete': None})
+    tag_name, relation = tokens[:2]
+    return AutoDisplayNode(tag_name, relation, **kwargs)
+
+
+def _parse_keywords(tokens, positional, kwargs):
+    """
+    Parse the keyword arguments of a tag.
+
+    :param tokens: The tokens of the tag including its name.
+    :type tokens: list
+    :param positional: The number of tokens before the keywords including
+                       the tag name.
+    :type positional: int
+    :param kwargs: The keywords and their defaults.
+    :type kwargs: dict
+    :rtype: A dict of the keyword arguments found.
+    :raises TemplateSyntaxError: If the tag arguments are invalid.
+    """
     size = len(tokens)
-    kwargs = {'prefix': '', 'options': None, 'display': 'False'}
     keywords = list(kwargs.keys())
     keywords.sort()
 
-    if size == 2:
-        tag_name, relation = tokens
+    if size == positional:
         kwargs = {}
-    elif size == 3:
-        tag_name, relation, value1 = tokens
+    elif positional < size <= positional + len(keywords):
         kwargs.update({k: v for k,d,v in [v.partition('=')
-                                          for v in (value1,)]})
-    elif size == 4:
-        tag_name, relation, value1, value2 = tokens
-        kwargs.update({k: v for k,d,v in [v.partition('=')
-                                          for v in (value1, value2)]})
-    elif size == 5:
-        tag_name, relation, value1, value2, value3 = tokens
-        kwargs.update({k: v for k,d,v in [v.partition('=')
-                                          for v in (value1, value2, value3)]})
+                                          for v in tokens[positional:]]})
     else:
-        msg = ("Invalid number of arguments should be 1 - 4, "
-               "found: {}").format(size-1)
+        msg = ("Invalid number of arguments should be {} - {}, "
+               "found: {}").format(positional - 1,
+                                   len(keywords) + positional - 1, size-1)
         raise template.TemplateSyntaxError(msg)
 
-    if size > 2 and not all([key in keywords for key in kwargs]):
+    if size > positional and not all([key in keywords for key in kwargs]):
         msg = "Invalid keyword name, should be one of {}".format(keywords)
         raise template.TemplateSyntaxError(msg)
 
-    return AutoDisplayNode(tag_name, relation, **kwargs)
+    return kwargs
+
+
+class CompiledOptions(object):
+    """
+    An options list compiled once per render into a map of the labels and
+    the escaped HTML of the ``<option>`` tags, so rendering a select only
+    splices in the ``selected`` marker.
+    """
+    OPTION_START = '<option value="{}"'
+    OPTION_END = '>{}</option>\n'
+    SELECTED = ' selected'
+
+    def __init__(self, options):
+        """
+        Constructor.
+
+        :param options: A list of ``(key, label)`` tuples.
+        :type options: list or tuple
+        """
+        self.labels = {}
+        self.keys = {}
+        self._spans = {}
+        fragments = []
+        pos = 0
+
+        for k, v in options:
+            self.labels[k] = v
+            self.keys.setdefault(v, k)
+            start = self.OPTION_START.format(k)
+            end = self.OPTION_END.format(conditional_escape(v))
+            # Where the selected marker goes in the HTML.
+            self._spans.setdefault(k, []).append(pos + len(start))
+            fragments.append(start)
+            fragments.append(end)
+            pos += len(start) + len(end)
+
+        self.html = ''.join(fragments)
+
+    def has_key(self, value):
+        """
+        Test if an option would be selected for ``value``.
+
+        :param value: The key of an option.
+        :rtype: bool
+        """
+        return value != 0 and value in self._spans
+
+    def render(self, value):
+        """
+        Get the HTML of the options with the option of ``value`` selected.
+
+        :param value: The key of the selected option, ``0`` or a missing key
+                      selects nothing.
+        :rtype: str
+        """
+        if not self.has_key(value):
+            return self.html
+
+        spans = self._spans[value]
+        html = self.html
+        parts = []
+        last = 0
+
+        for pos in spans:
+            parts.append(html[last:pos])
+            parts.append(self.SELECTED)
+            last = pos
+
+        parts.append(html[last:])
+        return ''.join(parts)
 
 
 class AutoDisplayNode(template.Node):
@@ -143,14 +232,20 @@ class AutoDisplayNode(template.Node):
         DynamicColumn.TIME: ('<input id="{}" type="time" name="{}" '
                              'value="{}" />'),
         }
+    AUTOCOMPLETE_TAG = ('<input id="{0}" name="{1}" type="hidden" '
+                        'value="{2}" />\n<input id="{0}-search" '
+                        'class="dcolumn-autocomplete" type="text" '
+                        'data-target="{0}" data-url="{3}" value="{4}" '
+                        'autocomplete="off" />\n')
 
     def __init__(self, tag_name, relation, prefix='', options=None,
-                 display='False'):
+                 display='False', autocomplete=None):
         self.tag_name = tag_name
         self.relation = template.Variable(relation)
         self.prefix = prefix
         self.fk_options = template.Variable(options) if options else None
         self.display = eval(display)
+        self.autocomplete = autocomplete
 
     def render(self, context):
         """
@@ -165,6 +260,18 @@ class AutoDisplayNode(template.Node):
         except template.VariableDoesNotExist:
             relation = None
 
+        return mark_safe(self._render_relation(context, relation))
+
+    def _render_relation(self, context, relation):
+        """
+        Render the HTML element of one relation.
+
+        :param context: The context as provided by django.
+        :type context: dict
+        :param relation: The meta data for a dynamic column.
+        :type relation: dict
+        :rtype: The HTML element as a str.
+        """
         log.debug(gettext("relation: %s, display: %s"),
                   relation, self.display)
 
@@ -174,18 +281,23 @@ class AutoDisplayNode(template.Node):
             if self.display:
                 elem = self.DISPLAY_TAG
             else:
-                elem = self.ELEMENT_TYPES.get(value_type, '')
+                # Custom value types are edited as text.
+                elem = self.ELEMENT_TYPES.get(
+                    value_type, self.ELEMENT_TYPES[DynamicColumn.TEXT])
 
             attr = "{}{}".format(self.prefix, relation.get('slug'))
 
             # Choices are a special case since we need to determine
             # what the options will be.
-            if value_type == DynamicColumn.CHOICE:
+            if value_type == DynamicColumn.CHOICE and self.autocomplete:
+                elem = self._add_autocomplete(elem, attr, relation)
+            elif value_type == DynamicColumn.CHOICE:
                 if self.fk_options:
                     # The fk_options variable should always be found since it
                     # is tested for in the tag's function.
                     fk_options = self.fk_options.resolve(context)
-                    options = self._find_options(relation, fk_options)
+                    options = self._compile_options(
+                        context, self._find_options(relation, fk_options))
 
                     if self.display:
                         elem = self._find_value(elem, attr, options, relation)
@@ -193,19 +305,22 @@ class AutoDisplayNode(template.Node):
                         elem = self._add_options(elem, attr, options, relation)
 
                         if (relation.get('store_relation', False) and
-                            'selected' not in elem):
+                            not options.has_key(
+                                self._find_key(options, relation))):
                             tmp_elem = self._find_value(
-                                self.DISPLAY_TAG, 'store-' + attr, {},
+                                self.DISPLAY_TAG, 'store-' + attr, options,
                                 relation)
                             elem = self.STORE_WRAPPER.format(elem, tmp_elem)
                 else:
                     elem = "<span>{}{}</span>".format(self.OPTION_ERROR_MSG,
                                                       self.fk_options)
             elif value_type == DynamicColumn.BOOLEAN:
+                options = self._compile_options(context, self.YES_NO)
+
                 if self.display:
-                    elem = self._find_value(elem, attr, self.YES_NO, relation)
+                    elem = self._find_value(elem, attr, options, relation)
                 else:
-                    elem = self._add_options(elem, attr, self.YES_NO, relation)
+                    elem = self._add_options(elem, attr, options, relation)
             elif self.display:
                 elem = elem.format("id-" + attr, relation.get('value', ''))
             else:
@@ -215,7 +330,45 @@ class AutoDisplayNode(template.Node):
             elem = "<span>{}{}</span>".format(self.RELATION_ERROR_MSG,
                                               relation)
 
-        return mark_safe(elem)
+        return elem
+
+    def _add_autocomplete(self, elem, attr, relation):
+        """
+        Produce an autocomplete widget for a ``CHOICE`` relation, or the
+        label in display mode. The label of the current value is found in
+        the cached choice index so no options need to be in the context.
+
+        :param elem: The HTML element used in display mode.
+        :type elem: str
+        :param attr: Text object to be used when creating the element's
+                     attributes.
+        :type attr: str
+        :param relation: The meta data for a dynamic column.
+        :type relation: dict
+        :rtype: The populated HTML element.
+        """
+        model, field = dcolumn_manager.get_relation_model_field(
+            relation.get('relation'))
+        index = choice_index_cache.get_index(model, field)
+        value = relation.get('value', '')
+
+        if relation.get('store_relation', False):
+            label = value if value not in ('0', 0) else ''
+            pk = index.get_pk(label) if label else 0
+        else:
+            pk = int(value) if str(value).isdigit() else 0
+            label = index.get_label(pk) if pk else ''
+
+        if self.display:
+            elem = elem.format("id-" + attr, escape(label))
+        else:
+            url = reverse('dcolumns:api-choices', kwargs={
+                'class_name': self.autocomplete,
+                'slug': relation.get('slug')})
+            elem = self.AUTOCOMPLETE_TAG.format(
+                "id-" + attr, attr, pk, url, escape(label))
+
+        return elem
 
     def _find_options(self, relation, fk_options):
         """
@@ -248,51 +401,72 @@ class AutoDisplayNode(template.Node):
                   relation, fk_options, options)
         return options
 
-    def _add_options(self, elem, attr, options, relation):
+    def _compile_options(self, context, options):
         """
-        Find the value in the options if it exists and set the selected
-        property on the appropriate option. In the case of a stored relation
-        find the selected option by the actual value as the PK is not
-        available in this case.
+        Get the compiled options list. Each list is compiled once for each
+        render, all the ``auto_display`` tags in a template share them.
 
-        :param elem: The HTML element.
-        :type elem: str
-        :param attr: Text object to be used when creating the element's
-                     attributes.
-        :type attr: str
+        :param context: The context as provided by django.
+        :type context: dict
         :param options: The options used when creating the HTML select element.
         :type options: list
+        :rtype: A ``CompiledOptions`` object.
+        """
+        cache = context.render_context.setdefault(CompiledOptions, {})
+        found, compiled = cache.get(id(options), (None, None))
+
+        # The id of a list freed during the render could be reused.
+        if found is not options:
+            compiled = CompiledOptions(options)
+            cache[id(options)] = (options, compiled)
+
+        return compiled
+
+    def _find_key(self, options, relation):
+        """
+        Find the key of the selected option. In the case of a stored
+        relation the key is found by the actual value as the PK is not
+        available in this case.
+
+        :param options: The compiled options.
+        :type options: CompiledOptions
         :param relation: The meta data for a dynamic column.
         :type relation: dict
-        :rtype: The populated HTML element.
+        :rtype: The key of the selected option.
         """
-        elem = elem.format("id-" + attr, attr)
-        buff = io.StringIO(elem)
-        buff.seek(0, os.SEEK_END)
         value = relation.get('value', '')
 
         # Get the ID if the value is stored not the pk.
         if relation.get('store_relation', False):
-            value = [k for k, v in options if v == value]
-            value = value[0] if len(value) > 0 else 0
+            value = options.keys.get(value, 0)
 
         if (isinstance(value, str)
             and value.isdigit()): # pragma: no cover
             value = int(value)
 
-        for k, v in options:
-            s = ""
-
-            if k == value and value != 0:
-                s = " selected"
+        return value
 
-            buff.write('<option value="{}"{}>{}</option>\n'.format(k, s, v))
+    def _add_options(self, elem, attr, options, relation):
+        """
+        Find the value in the options if it exists and set the selected
+        property on the appropriate option.
 
-        buff.write('</select>\n')
-        elem = buff.getvalue()
-        buff.close()
-        log.debug(gettext("elem: %s, attr: %s, options: %s, relation: %s, "
-                           "value: %s"), elem, attr, options, relation, value)
+        :param elem: The HTML element.
+        :type elem: str
+        :param attr: Text object to be used when creating the element's
+                     attributes.
+        :type attr: str
+        :param options: The compiled options.
+        :type options: CompiledOptions
+        :param relation: The meta data for a dynamic column.
+        :type relation: dict
+        :rtype: The populated HTML element.
+        """
+        value = self._find_key(options, relation)
+        elem = "{}{}</select>\n".format(
+            elem.format("id-" + attr, attr), options.render(value))
+        log.debug(gettext("elem: %s, attr: %s, relation: %s, value: %s"),
+                  elem, attr, relation, value)
         return elem
 
     def _find_value(self, elem, attr, options, relation):
@@ -305,14 +479,14 @@ class AutoDisplayNode(template.Node):
         :param attr: Text object to be used when creating the element's
                      attributes.
         :type attr: str
-        :param options: The options used when creating the HTML select element.
-        :type options: list
+        :param options: The compiled options.
+        :type options: CompiledOptions
         :param relation: The meta data for a dynamic column.
         :type relation: dict
         :rtype: The populated HTML element.
         """
-        log.debug(gettext("elem: %s, attr: %s, options: %s, relation: %s"),
-                  elem, attr, options, relation)
+        log.debug(gettext("elem: %s, attr: %s, relation: %s"),
+                  elem, attr, relation)
         value_type = relation.get('value_type')
         value = relation.get('value', '')
         key = None
@@ -336,12 +510,100 @@ class AutoDisplayNode(template.Node):
             else:
                 key = value
 
-            value = dict(options).get(key, '')
+            value = options.labels.get(key, '')
 
         elem = elem.format("id-" + attr, value)
         return elem
 
 
+#
+# render_location
+#
+# NOTE: Formatting of the doc string is to conform with django docs not sphinx.
+#
+@register.tag(name='render_location')
+def render_location(parser, token):
+    """
+    This tag returns the HTML list items of all the relations in one CSS
+    container. It takes the same keyword arguments as 'auto_display' and
+    one more.
+
+    Arguments::
+
+      relations -- The 'relations' template context object.
+      location  -- The template variable name of the CSS container, as
+                   registered with 'register_css_containers'.
+      errors    -- A keyword argument who's value is a dict of errors keyed
+                   by slug, usually 'form.errors'. The errors of a relation
+                   are rendered after its element as 'combine_contexts'
+                   does.
+
+    Usage Examples::
+
+      {% render_location relations 'book_top' options=dynamicColumns display=True %}
+
+      {% render_location relations 'book_top' options=dynamicColumns errors=form.errors %}
+    """
+    tokens = token.split_contents()
+
+    if len(tokens) < 3:
+        msg = "{} tag requires at least two arguments.".format(tokens[0])
+        raise template.TemplateSyntaxError(msg)
+
+    kwargs = _parse_keywords(tokens, 3, {
+        'prefix': '', 'options': None, 'display': 'False',
+        'autocomplete': None, 'errors': None})
+    tag_name, relations, location = tokens[:3]
+    return RenderLocationNode(tag_name, relations, location, **kwargs)
+
+
+class RenderLocationNode(AutoDisplayNode):
+    """
+    Node class for the ``render_location`` tag.
+    """
+    DISPLAY_ITEM = '<li>\n<label>{1}</label>\n{2}\n</li>\n'
+    ENTRY_ITEM = '<li>\n<label for="id-{0}">{1}</label>\n{2}\n{3}</li>\n'
+
+    def __init__(self, tag_name, relations, location, errors=None,
+                 **kwargs):
+        super(RenderLocationNode, self).__init__(tag_name, relations,
+                                                 **kwargs)
+        self.location = template.Variable(location)
+        self.errors = template.Variable(errors) if errors else None
+
+    def render(self, context):
+        """
+        Render the list items of the relations in the location.
+
+        :param context: The context as provided by django.
+        :type context: dict
+        :rtype: The HTML list items.
+        """
+        relations = self.relation.resolve(context)
+        location = self.location.resolve(context)
+        css = dcolumn_manager.css_container_map.get(location, location)
+        errors = self.errors.resolve(context) if self.errors else {}
+
+        if hasattr(relations, 'locations'):
+            items = relations.locations.get(css, ())
+        else:
+            items = sorted((relation for relation in relations.values()
+                            if relation.get('location') == css),
+                           key=lambda relation: relation.get('order'))
+
+        item = self.DISPLAY_ITEM if self.display else self.ENTRY_ITEM
+        html = []
+
+        for relation in items:
+            slug = relation.get('slug')
+            html.append(item.format(
+                escape(self.prefix + slug), escape(relation.get('name')),
+                self._render_relation(context, relation),
+                errors.get(slug) or ''))
+
+        return mark_safe(''.join(html))
+
+
 #
 # single_display
 #
@@ -416,6 +678,85 @@ class SingleDisplayNode(template.Node):
         return ''
 
 
+#
+# row_display
+#
+# NOTE: Formatting of the doc string is to conform with django docs not
+#       Sphinx.
+#
+@register.tag(name='row_display')
+def row_display(parser, token):
+    """
+    Returns a context variable containing a dict of the values of several
+    slugs keyed by slug. The values are loaded together so a list template
+    does not need a 'single_display' tag for each column.
+
+    Arguments::
+
+      obj   -- A CollectionBase derived model object.
+      slugs -- A comma separated string of slugs or a list of slugs.
+      as    -- Manditory delimiter.
+      name  -- Name for the context variable.
+
+    Usage Examples::
+
+      {% row_display <object> <slugs> as <context name> %}
+
+      {% row_display obj 'book_sku,author,publisher' as row %}
+      {{ row.book_sku }}
+    """
+    try:
+        tag_name, obj, slugs, delimiter, name = token.split_contents()
+    except ValueError:
+        msg = _("{} tag requires four arguments.").format(
+            token.contents.split()[0])
+        raise template.TemplateSyntaxError(msg)
+
+    if delimiter != 'as':
+        msg = _("The third argument must be the word 'as' found '{}'.").format(
+            delimiter)
+        raise template.TemplateSyntaxError(msg)
+
+    return RowDisplayNode(tag_name, obj, slugs, name)
+
+
+class RowDisplayNode(template.Node):
+    """
+    Node class for the ``row_display`` tag.
+    """
+
+    def __init__(self, tag_name, obj, slugs, name):
+        self.tag_name = tag_name
+        self.obj = template.Variable(obj)
+        self.slugs = template.Variable(slugs)
+        self.name = name
+
+    def render(self, context):
+        """
+        Render the results into the context.
+
+        :param context: The context as provided by django.
+        :type context: dict
+        :rtype: empty string
+        """
+        try:
+            obj = self.obj.resolve(context)
+        except template.VariableDoesNotExist:
+            msg = _("The model object does not exist in the context, "
+                    "found '{}'").format(self.obj)
+            log.warning(gettext(msg))
+            raise template.VariableDoesNotExist(msg)
+
+        slugs = self.slugs.resolve(context)
+
+        if isinstance(slugs, str):
+            slugs = [slug.strip() for slug in slugs.split(',')
+                     if slug.strip()]
+
+        context[self.name] = obj.get_key_values(slugs)
+        return ''
+
+
 #
 # combine_contexts
 #
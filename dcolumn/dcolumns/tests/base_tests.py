@@ -8,12 +8,16 @@ import pytz
 import json
 
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
 from django.test import TestCase
 
 from example_site.books.models import Author, Book, Publisher, Promotion
 from dcolumn.dcolumns.manager import DynamicColumnManager
 
 from ..models import DynamicColumn, ColumnCollection, KeyValue
+from ..schema import schema_cache
+from ..choice_index import choice_index_cache
+from ..kv_cache import kv_cache
 
 User = get_user_model()
 
@@ -30,10 +34,19 @@ class BaseDcolumns(object):
             [(v, k) for k, v in self.manager.choice_relations])
 
     def setUp(self):
+        # The test database is rolled back without sending any signals.
+        schema_cache.clear()
+        choice_index_cache.clear()
+        kv_cache.clear()
+        caches['default'].clear()
         self.user = self._create_user()
 
     def tearDown(self):
         self.user = None
+        schema_cache.clear()
+        choice_index_cache.clear()
+        kv_cache.clear()
+        caches['default'].clear()
 
     def _create_user(self, username=_TEST_USERNAME, email=None,
                      password=_TEST_PASSWORD, is_superuser=True):
@@ -89,6 +102,9 @@ class BaseDcolumns(object):
             defaults=kwargs)
 
         if not created:
+            # Use the same collection instance so its KeyValue snapshot
+            # gets refreshed.
+            obj.collection = collection
             obj.value = value
             obj.save()
 
@@ -99,7 +115,7 @@ class BaseDcolumns(object):
         """
         Create  a set of Author objects.
         """
-        dcs = extra_dcs
+        dcs = list(extra_dcs)
         dc0 = self._create_dynamic_column_record(
             "Web Site", DynamicColumn.TEXT, 'author_top', 1, required=required)
         dcs.append(dc0)
@@ -119,7 +135,7 @@ class BaseDcolumns(object):
         """
         Create  a set of Publisher objects.
         """
-        dcs = extra_dcs
+        dcs = list(extra_dcs)
         dc0 = self._create_dynamic_column_record(
             "Web Site", DynamicColumn.TEXT, 'publisher_top', 1,
             required=required)
@@ -142,7 +158,7 @@ class BaseDcolumns(object):
         """
         Create  a set of Promotion objects.
         """
-        dcs = extra_dcs
+        dcs = list(extra_dcs)
         # Create promotion description
         dc0 = self._create_dynamic_column_record(
             "Description", DynamicColumn.TEXT, 'promotion_top', 1,
@@ -185,7 +201,7 @@ class BaseDcolumns(object):
         """
         Create  a set of Book objects.
         """
-        dcs = extra_dcs
+        dcs = list(extra_dcs)
         dc0 = self._create_dynamic_column_record(
             "Abstract", DynamicColumn.TEXT_BLOCK, 'book_top', 1,
             required=required)
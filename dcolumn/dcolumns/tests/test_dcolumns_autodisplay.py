@@ -15,8 +15,10 @@ from django.template import (
     Template, Context, TemplateSyntaxError, VariableDoesNotExist)
 
 from example_site.books.models import Author, Book, Promotion, Publisher
-from dcolumn.dcolumns.models import DynamicColumn
+from dcolumn.dcolumns.models import DynamicColumn, ColumnCollection
 
+from ..manager import dcolumn_manager
+from ..templatetags.autodisplay import AutoDisplayNode, CompiledOptions
 from ..views import ContextDataMixin
 from .base_tests import BaseDcolumns
 
@@ -102,11 +104,13 @@ class TestAutoDisplay(BaseDcolumns, TestCase):
 
     def _setup_template(self, model, object=None, prefix=None, options=None,
                         display=None, except_test=False, invalid_kwargs=None,
-                        relation_name='relation', munge_slug=(None, None)):
+                        relation_name='relation', munge_slug=(None, None),
+                        autocomplete=None):
         # Setup the context.
         vmt = ViewMixinTest()
         vmt.model = model
         vmt.object = object
+        vmt.lazy_choices = autocomplete is not None
         context = Context(vmt.get_context_data(munge_slug=munge_slug))
         # Run the test.
         buff = io.StringIO()
@@ -116,8 +120,10 @@ class TestAutoDisplay(BaseDcolumns, TestCase):
         p = " prefix={}".format(prefix) if prefix is not None else ''
         o = " options={}".format(options) if options is not None else ''
         d = " display={}".format(display) if display is not None else ''
+        a = (" autocomplete={}".format(autocomplete)
+             if autocomplete is not None else '')
         i = invalid_kwargs if invalid_kwargs else ''
-        cmd = "{{% auto_display{}{}{}{}{} %}}".format(r, p, o, d, i)
+        cmd = "{{% auto_display{}{}{}{}{}{} %}}".format(r, p, o, d, a, i)
         buff.write(cmd)
         buff.write("{% endfor %}")
         template = buff.getvalue()
@@ -283,6 +289,46 @@ class TestAutoDisplay(BaseDcolumns, TestCase):
         value = book.get_key_value('author')
         self.assertTrue(value in result, msg)
 
+    def test_CHOICE_autocomplete_display(self):
+        """
+        Test that the CHOICE type autocomplete display HTML is correct.
+        """
+        #self.skipTest("Temporarily skipped")
+        # Create database objects.
+        author, a_cc, a_values = self._create_author_objects()
+        promotion, p_cc, p_values = self._create_promotion_objects()
+        book, b_cc, b_values = self._create_book_objects(
+            author=author, promotion=promotion)
+        # Execute the template tag and test.
+        context, result = self._setup_template(
+            Book, object=book, display=True, autocomplete='book')
+        msg = "result: {}, context: {}, values: {}".format(
+            result, context, b_values)
+        self.assertFalse('author' in context.get('dynamicColumns', {}), msg)
+        self.assertEqual(result.count('<span'), len(b_values), msg)
+        self.assertTrue(author.name in result, msg)
+        self.assertTrue(b_values['promotion'] in result, msg)
+
+    def test_CHOICE_autocomplete_entry(self):
+        """
+        Test that the CHOICE type autocomplete entry HTML is correct.
+        """
+        #self.skipTest("Temporarily skipped")
+        # Create database objects.
+        author, a_cc, a_values = self._create_author_objects()
+        book, b_cc, b_values = self._create_book_objects(author=author)
+        # Execute the template tag and test.
+        context, result = self._setup_template(
+            Book, object=book, autocomplete='book')
+        msg = "result: {}, context: {}, values: {}".format(
+            result, context, b_values)
+        self.assertEqual(result.count('option'), 0, msg)
+        self.assertTrue('class="dcolumn-autocomplete"' in result, msg)
+        self.assertTrue('value="{}"'.format(author.pk) in result, msg)
+        self.assertTrue('value="{}"'.format(author.name) in result, msg)
+        self.assertTrue('/api/collections/book/choices/author/' in result,
+                        msg)
+
     def test_CHOICE_store_realtion_display(self):
         """
         Test that the CHOICE type with store_relation set True display HTML is
@@ -596,6 +642,49 @@ class TestAutoDisplay(BaseDcolumns, TestCase):
         self.assertEqual(result.count('textarea'), 4, msg)
         self.assertTrue(value in result, msg)
 
+    def test_CompiledOptions(self):
+        """
+        Test that the options are compiled into escaped HTML and that only
+        the selected marker is added when rendered.
+        """
+        #self.skipTest("Temporarily skipped")
+        options = CompiledOptions(
+            ((0, 'Choose a value'), (1, 'Tom & Jerry'), (2, '<b>')))
+        html = options.render(0)
+        msg = "html: {}".format(html)
+        self.assertEqual(html.count('<option'), 3, msg)
+        self.assertFalse('selected' in html, msg)
+        self.assertTrue('>Tom &amp; Jerry<' in html, msg)
+        self.assertTrue('>&lt;b&gt;<' in html, msg)
+        html = options.render(2)
+        msg = "html: {}".format(html)
+        self.assertTrue('<option value="2" selected>' in html, msg)
+        self.assertEqual(html.count('selected'), 1, msg)
+        self.assertEqual(options.render(99), options.html, msg)
+        self.assertEqual(options.labels.get(1), 'Tom & Jerry', msg)
+        self.assertEqual(options.keys.get('Tom & Jerry'), 1, msg)
+        self.assertTrue(options.has_key(1), msg)
+        self.assertFalse(options.has_key(0), msg)
+
+    def test_compile_options(self):
+        """
+        Test that an options list is compiled once for each render and
+        shared by all the nodes.
+        """
+        #self.skipTest("Temporarily skipped")
+        options = [(0, 'Choose a value'), (1, 'English')]
+        node0 = AutoDisplayNode('auto_display', 'relation')
+        node1 = AutoDisplayNode('auto_display', 'relation', display='True')
+        context = Context({})
+        compiled = node0._compile_options(context, options)
+        msg = "compiled: {}".format(compiled)
+        self.assertTrue(node0._compile_options(context, options) is compiled,
+                        msg)
+        self.assertTrue(node1._compile_options(context, options) is compiled,
+                        msg)
+        # Test that a new render compiles the options again.
+        self.assertFalse(
+            node0._compile_options(Context({}), options) is compiled, msg)
 
 class TestSingleDisplay(BaseDcolumns, TestCase):
 
@@ -861,6 +950,72 @@ class TestSingleDisplay(BaseDcolumns, TestCase):
         self.assertEqual(value, context.get('now'), msg)
 
 
+class TestRowDisplay(BaseDcolumns, TestCase):
+
+    def __init__(self, name):
+        super(TestRowDisplay, self).__init__(name)
+
+    def setUp(self):
+        super(TestRowDisplay, self).setUp()
+
+    def _render(self, cmd, **kwargs):
+        context = Context(kwargs)
+        Template("{% load autodisplay %}" + cmd).render(context)
+        return context
+
+    def test_row_display(self):
+        """
+        Test that the values of all the slugs are put in the context.
+        """
+        #self.skipTest("Temporarily skipped")
+        author, a_cc, a_values = self._create_author_objects()
+        promotion, p_cc, p_values = self._create_promotion_objects()
+        book, b_cc, b_values = self._create_book_objects(
+            author=author, promotion=promotion)
+        book = Book.objects.get(pk=book.pk)
+
+        with self.assertNumQueries(2):
+            context = self._render(
+                "{% row_display obj 'author, promotion,abstract' as row %}",
+                obj=book)
+
+        row = context.get('row')
+        msg = "row: {}, b_values: {}".format(row, b_values)
+        self.assertEqual(list(row), ['author', 'promotion', 'abstract'], msg)
+        self.assertEqual(row.get('author'), author.name, msg)
+        self.assertEqual(row.get('promotion'), b_values.get('promotion'),
+                         msg)
+        self.assertEqual(row.get('abstract'), b_values.get('abstract'), msg)
+        # Test that prefetched key values are used and a list of slugs.
+        book = Book.objects.with_key_values().get(pk=book.pk)
+
+        with self.assertNumQueries(0):
+            context = self._render("{% row_display obj slugs as row %}",
+                                   obj=book, slugs=['author', 'bad-slug'])
+
+        row = context.get('row')
+        msg = "row: {}".format(row)
+        self.assertEqual(row.get('author'), author.name, msg)
+        self.assertEqual(row.get('bad-slug'), '', msg)
+
+    def test_exceptions(self):
+        """
+        Test that exceptions happen when they are supposed to happen.
+        """
+        #self.skipTest("Temporarily skipped")
+        book, b_cc, b_values = self._create_book_objects()
+
+        with self.assertRaises(TemplateSyntaxError) as cm:
+            self._render("{% row_display obj 'abstract' %}", obj=book)
+
+        with self.assertRaises(TemplateSyntaxError) as cm:
+            self._render("{% row_display obj 'abstract' of row %}", obj=book)
+
+        with self.assertRaises(VariableDoesNotExist) as cm:
+            self._render("{% row_display objX 'abstract' as row %}",
+                         obj=book)
+
+
 class TestCombineContexts(BaseDcolumns, TestCase):
 
     def __init__(self, name):
@@ -900,3 +1055,82 @@ class TestCombineContexts(BaseDcolumns, TestCase):
         with self.assertRaises(TemplateSyntaxError) as cm:
             self._setup_template(Book, book, 'form.errors', 'relation.slug',
                                  extra_arg='junk')
+
+
+class TestRenderLocation(BaseDcolumns, TestCase):
+
+    def __init__(self, name):
+        super(TestRenderLocation, self).__init__(name)
+
+    def setUp(self):
+        super(TestRenderLocation, self).setUp()
+
+    def _setup_template(self, model, object=None, args='', extra=None):
+        # Setup the context.
+        vmt = ViewMixinTest()
+        vmt.model = model
+        vmt.object = object
+        context = Context(vmt.get_context_data())
+        context.update(extra or {})
+        cmd = "{{% load autodisplay %}}{{% render_location{} %}}".format(args)
+        return context, Template(cmd).render(context)
+
+    def test_render_location(self):
+        """
+        Test that all the relations in a location are rendered.
+        """
+        #self.skipTest("Temporarily skipped")
+        author, a_cc, a_values = self._create_author_objects()
+        book, b_cc, b_values = self._create_book_objects(author=author)
+        relations = ColumnCollection.objects.serialize_columns('book')
+        count = {}
+
+        for relation in relations.values():
+            count[relation['location']] = count.get(
+                relation['location'], 0) + 1
+
+        # Test display mode.
+        context, result = self._setup_template(
+            Book, object=book,
+            args=" relations 'book_top' options=dynamicColumns display=True")
+        css = dcolumn_manager.css_container_map.get('book_top')
+        msg = "result: {}, count: {}".format(result, count)
+        self.assertEqual(result.count('<li>'), count.get(css), msg)
+        self.assertEqual(result.count('<span'), count.get(css), msg)
+        self.assertTrue(author.name in result, msg)
+        # Test entry mode with errors.
+        context, result = self._setup_template(
+            Book, object=book,
+            args=" relations 'book_top' options=dynamicColumns errors=errors",
+            extra={'errors': {'author': 'Bad author'}})
+        msg = "result: {}, count: {}".format(result, count)
+        self.assertEqual(result.count('<li>'), count.get(css), msg)
+        self.assertTrue('<label for="id-author">' in result, msg)
+        self.assertTrue('Bad author' in result, msg)
+        # Test that a plain dict of relations is grouped by the tag.
+        context, result2 = self._setup_template(
+            Book, object=book,
+            args=" plain 'book_top' options=dynamicColumns errors=errors",
+            extra={'errors': {'author': 'Bad author'},
+                   'plain': dict(context['relations'])})
+        msg = "result: {}, result2: {}".format(result, result2)
+        self.assertEqual(result, result2, msg)
+        # Test that an unknown location renders nothing.
+        context, result = self._setup_template(
+            Book, object=book, args=" relations 'unknown'")
+        msg = "result: {}".format(result)
+        self.assertEqual(result, '', msg)
+
+    def test_exceptions(self):
+        """
+        Test that any exceptions are raised in the proper conditions.
+        """
+        #self.skipTest("Temporarily skipped")
+        book, b_cc, b_values = self._create_book_objects()
+
+        with self.assertRaises(TemplateSyntaxError) as cm:
+            self._setup_template(Book, object=book, args=" relations")
+
+        with self.assertRaises(TemplateSyntaxError) as cm:
+            self._setup_template(Book, object=book,
+                                 args=" relations 'book_top' junk=1")
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+#
+# dcolumn/dcolumns/tests/test_dcolumns_codecs.py
+#
+# WARNING: These unittests can only be run from within the original test
+#          framework from https://github.com/cnobile2012/dcolumn.
+#
+import datetime
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from example_site.books.models import Author
+
+from ..codecs import (
+    codec_registry, parse_datetime, CodecRegistry, ValueCodec, DateCodec,
+    FloatCodec, NumberCodec, TimeCodec)
+from ..models import DynamicColumn
+from .base_tests import BaseDcolumns
+
+
+class ColorCodec(ValueCodec):
+
+    def encode(self, value):
+        if isinstance(value, tuple):
+            value = "#{:02x}{:02x}{:02x}".format(*value)
+
+        if not (isinstance(value, str) and value.startswith('#')):
+            raise ValueError("Not a color.")
+
+        return value
+
+    def decode(self, value):
+        return tuple(int(value[i:i + 2], 16) for i in (1, 3, 5))
+
+
+class TestCodecs(TestCase):
+
+    def __init__(self, name):
+        super(TestCodecs, self).__init__(name)
+
+    def test_parse_datetime(self):
+        """
+        Test that ISO 8601 strings do not use dateutil and that other
+        formats still parse.
+        """
+        #self.skipTest("Temporarily skipped")
+        path = 'dcolumn.dcolumns.codecs.parser.parse'
+
+        with mock.patch(path) as parse:
+            result = parse_datetime('2016-04-08T10:30:00-04:00')
+            msg = "result: {}".format(result)
+            self.assertFalse(parse.called, msg)
+            self.assertEqual(result.isoformat(), '2016-04-08T10:30:00-04:00',
+                             msg)
+
+        result = parse_datetime('April 8, 2016 10:30 AM')
+        expected = datetime.datetime(2016, 4, 8, 10, 30)
+        msg = "result: {}, expected: {}".format(result, expected)
+        self.assertEqual(result, expected, msg)
+
+        with self.assertRaises(ValueError):
+            parse_datetime('Not a date')
+
+    def test_date_time_codecs(self):
+        """
+        Test that the date and time codecs take the fast path and fall back
+        to full date time strings.
+        """
+        #self.skipTest("Temporarily skipped")
+        tests = (
+            (DateCodec(), '2016-04-08', datetime.date(2016, 4, 8)),
+            (DateCodec(), '2016-04-08T10:30:00', datetime.date(2016, 4, 8)),
+            (DateCodec(), 'April 8, 2016', datetime.date(2016, 4, 8)),
+            (TimeCodec(), '10:30:00', datetime.time(10, 30)),
+            (TimeCodec(), '2016-04-08T10:30:00', datetime.time(10, 30)),
+            )
+
+        for codec, value, expected in tests:
+            result = codec.decode(value)
+            msg = "value: {}, result: {}, expected: {}".format(
+                value, result, expected)
+            self.assertEqual(result, expected, msg)
+
+        value = datetime.date(2016, 4, 8)
+        result = DateCodec().encode(value)
+        msg = "result: {}".format(result)
+        self.assertEqual(result, '2016-04-08', msg)
+
+        with self.assertRaises(ValueError):
+            DateCodec().encode('Not a date')
+
+    def test_number_codecs(self):
+        """
+        Test that the number and float codecs both accept negative values
+        and reject anything else that is not a number.
+        """
+        #self.skipTest("Temporarily skipped")
+        tests = (
+            (NumberCodec(), 5, '5', 5),
+            (NumberCodec(), -5, '-5', -5),
+            (NumberCodec(), '-5', '-5', -5),
+            (FloatCodec(), 2.5, '2.5', 2.5),
+            (FloatCodec(), -2.5, '-2.5', -2.5),
+            (FloatCodec(), '-2.5', '-2.5', -2.5),
+            (FloatCodec(), -2, '-2.0', -2.0),
+            )
+
+        for codec, value, encoded, decoded in tests:
+            result = codec.encode(value)
+            msg = "value: {}, result: {}, expected: {}".format(
+                value, result, encoded)
+            self.assertEqual(result, encoded, msg)
+            result = codec.decode(result)
+            msg = "value: {}, result: {}, expected: {}".format(
+                value, result, decoded)
+            self.assertEqual(result, decoded, msg)
+
+        for codec in (NumberCodec(), FloatCodec()):
+            for value in ('--5', '5-', '-', 'five', '1.2.3', None):
+                msg = "codec: {}, value: {}".format(
+                    codec.__class__.__name__, value)
+
+                with self.assertRaises(ValueError, msg=msg):
+                    codec.encode(value)
+
+        for value in ('2.5', '-2.5'):
+            with self.assertRaises(ValueError):
+                NumberCodec().decode(value)
+
+    def test_decode_many(self):
+        """
+        Test that decode_many decodes each distinct value once and returns
+        None for empty values.
+        """
+        #self.skipTest("Temporarily skipped")
+        codec = NumberCodec()
+        values = ['1', '-2', '', None, '1', '1']
+
+        with mock.patch.object(codec, 'decode', wraps=codec.decode) as decode:
+            result = codec.decode_many(values)
+
+        expected = [1, -2, None, None, 1, 1]
+        msg = "result: {}, expected: {}".format(result, expected)
+        self.assertEqual(result, expected, msg)
+        msg = "call_count: {}".format(decode.call_count)
+        self.assertEqual(decode.call_count, 2, msg)
+
+        with self.assertRaises(ValueError):
+            codec.decode_many(['1', 'one'])
+
+    def test_registry(self):
+        """
+        Test registering, getting and removing codecs.
+        """
+        #self.skipTest("Temporarily skipped")
+        registry = CodecRegistry()
+        codec = ColorCodec()
+        registry.register(100, codec, "Color")
+        msg = "choices: {}".format(registry.choices)
+        self.assertTrue(100 in registry, msg)
+        self.assertIs(registry.get(100), codec, msg)
+        self.assertEqual(registry.get_label(100), "Color", msg)
+        self.assertEqual(registry.choices, [(100, "Color")], msg)
+        registry.unregister(100)
+        self.assertFalse(100 in registry, msg)
+        self.assertEqual(registry.get_label(100, 'None'), 'None', msg)
+
+        with self.assertRaises(ValueError):
+            registry.get(100)
+
+        with self.assertRaises(TypeError):
+            registry.register(100, object(), "Color")
+
+        # Test that the built in value types are registered.
+        for value_type, label in DynamicColumn.VALUE_TYPES:
+            msg = "value_type: {}".format(value_type)
+            self.assertEqual(codec_registry.get_label(value_type), label, msg)
+
+
+class TestCustomValueType(BaseDcolumns, TestCase):
+    COLOR = 100
+
+    def __init__(self, name):
+        super(TestCustomValueType, self).__init__(name)
+
+    def setUp(self):
+        super(TestCustomValueType, self).setUp()
+        codec_registry.register(self.COLOR, ColorCodec(), "Color")
+        self.addCleanup(codec_registry.unregister, self.COLOR)
+
+    def tearDown(self):
+        super(TestCustomValueType, self).tearDown()
+
+    def test_key_value(self):
+        """
+        Test that a custom value type is stored and returned through its
+        codec.
+        """
+        #self.skipTest("Temporarily skipped")
+        dc = self._create_dynamic_column_record(
+            "Favorite Color", self.COLOR, 'author_top', 2)
+        author, a_cc, a_values = self._create_author_objects(extra_dcs=[dc])
+        author.set_key_value(dc.slug, (255, 128, 0))
+        author = Author.objects.get(pk=author.pk)
+        result = author.get_key_value(dc.slug)
+        msg = "result: {}".format(result)
+        self.assertEqual(result, (255, 128, 0), msg)
+        self.assertEqual(dc.value_type_producer(), "Color", msg)
+
+        with self.assertRaises(ValueError) as cm:
+            author.set_key_value(dc.slug, 'red')
+
+        msg = "exception: {}".format(cm.exception)
+        self.assertTrue("Color" in str(cm.exception), msg)
+
+    def test_clean(self):
+        """
+        Test that DynamicColumn.clean accepts registered value types only.
+        """
+        #self.skipTest("Temporarily skipped")
+        dc = DynamicColumn(name="Favorite Color", value_type=self.COLOR,
+                           location='author_top', order=2)
+        dc.clean()
+        dc.value_type = self.COLOR + 1
+
+        with self.assertRaises(ValidationError) as cm:
+            dc.clean()
+
+        msg = "exception: {}".format(cm.exception)
+        self.assertTrue('value_type' in cm.exception.message_dict, msg)
@@ -10,9 +10,12 @@ import logging
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from dcolumn.test_app.forms import TestBookForm
 from example_site.books.models import Book #, Author, Publisher, Promotion
 
 from ..models import DynamicColumn, ColumnCollection
@@ -205,6 +208,73 @@ class TestCollectionBaseFormMixin(BaseDcolumns, TestCase):
             test_text, data.get('test_text'))
         self.assertEqual(test_text, data.get('test_text'), msg)
 
+    def _save_form(self, book, **values):
+        data = {
+            'title': book.title,
+            'test_choice': self.author.pk,
+            }
+        data.update(values)
+        form = TestBookForm(data=data, instance=Book.objects.get(pk=book.pk))
+
+        with CaptureQueriesContext(connection) as context:
+            msg = "errors: {}".format(form.errors)
+            self.assertTrue(form.is_valid(), msg)
+            form.save()
+
+        return context.captured_queries
+
+    def test_save_queries(self):
+        """
+        Test that the number of queries does not depend on the number of
+        columns and that unchanged values are not written.
+        """
+        #self.skipTest("Temporarily skipped")
+        book = self._create_dcolumn_record(Book, self.cc, title="Queries")
+        self._save_form(book, test_text="Text")
+        few = self._save_form(book, test_text="New text", test_integer=1)
+        many = self._save_form(
+            book, test_text="Other text", test_integer=2, test_float=2.5,
+            test_date='2020-01-02', test_time='10:20',
+            test_datetime='2020-01-02 10:20', test_text_block="Block")
+        msg = "few: {}, many: {}".format(len(few), len(many))
+        self.assertEqual(len(few), len(many), msg)
+        book = Book.objects.get(pk=book.pk)
+        values = book.serialize_key_values(by_slug=True)
+        msg = "values: {}".format(values)
+        self.assertEqual(values.get('test_text'), "Other text", msg)
+        self.assertEqual(values.get('test_integer'), 2, msg)
+        # Test that saving the same values does not write the KeyValues.
+        queries = self._save_form(
+            book, test_text="Other text", test_integer=2, test_float=2.5,
+            test_date='2020-01-02', test_time='10:20',
+            test_datetime='2020-01-02 10:20', test_text_block="Block")
+        writes = [q['sql'] for q in queries
+                  if 'dcolumns_keyvalue' in q['sql']
+                  and not q['sql'].startswith('SELECT')]
+        msg = "writes: {}".format(writes)
+        self.assertEqual(writes, [], msg)
+
+    def test_invalid_form(self):
+        """
+        Test that an invalid form does not leave its values on the
+        instance.
+        """
+        #self.skipTest("Temporarily skipped")
+        book = self._create_dcolumn_record(Book, self.cc, title="Invalid")
+        self._save_form(book, test_text="Text")
+        data = {'title': '', 'test_choice': self.author.pk,
+                'test_text': "Rejected text"}
+        form = TestBookForm(data=data, instance=Book.objects.get(pk=book.pk))
+        msg = "errors: {}".format(form.errors)
+        self.assertFalse(form.is_valid(), msg)
+        value = form.instance.get_key_value('test_text')
+        msg = "value: {}".format(value)
+        self.assertEqual(value, "Text", msg)
+        form.instance.save_deferred()
+        value = Book.objects.get(pk=book.pk).get_key_value('test_text')
+        msg = "value: {}".format(value)
+        self.assertEqual(value, "Text", msg)
+
     def test_validate_boolean_type(self):
         """
         Test that boolean types are validated properly.
@@ -6,6 +6,9 @@
 #          framework from https://github.com/cnobile2012/dcolumn.
 #
 
+from types import MappingProxyType
+from unittest import mock
+
 from django.conf import settings
 from django.test import TestCase, override_settings
 
@@ -75,7 +78,7 @@ class TestManager(BaseDcolumns, TestCase):
             methods.append(method)
 
         msg = "methods: {}".format(methods)
-        self.assertEqual(len(methods), 11, msg)
+        self.assertEqual(len(methods), 13, msg)
 
     def test_register_choice(self):
         """
@@ -85,6 +88,8 @@ class TestManager(BaseDcolumns, TestCase):
         should never need to be used outside of tests.
         """
         #self.skipTest("Temporarily skipped")
+        self.manager._thaw()
+        self.addCleanup(self.manager.freeze)
         self.manager.register_choice(Country, 99, 'name')
         msg = "class: {}, relation_num: {}, field: {}".format(
             Country.__name__, 99, 'name')
@@ -116,6 +121,8 @@ class TestManager(BaseDcolumns, TestCase):
         Test that the _unregister_choice method works.
         """
         #self.skipTest("Temporarily skipped")
+        self.manager._thaw()
+        self.addCleanup(self.manager.freeze)
         self.manager.register_choice(Country, 99, 'name')
         self.manager._unregister_choice(Country)
         msg = "class: {}, relation_num: {}, field: {}".format(
@@ -134,6 +141,41 @@ class TestManager(BaseDcolumns, TestCase):
         with self.assertRaises(ValueError) as cm:
             self.manager._unregister_choice(InvalidChoice)
 
+    def test_freeze(self):
+        """
+        Test that the registry is compiled into a read only snapshot and
+        that late registration raises an exception.
+        """
+        #self.skipTest("Temporarily skipped")
+        self.manager.freeze()
+        msg = "registry: {}".format(self.manager._registry)
+        self.assertTrue(self.manager._registry is not None, msg)
+        self.assertTrue(isinstance(self.manager.choice_relations, tuple), msg)
+        self.assertEqual(self.manager.choice_relations[0][0], 0, msg)
+        num = self.choice2index.get(Author.__name__)
+        self.assertEqual(self.manager.get_relation_model_field(num),
+                         (Author, 'name'), msg)
+        self.assertEqual(self.manager.get_relation_model_field(999),
+                         (None, None), msg)
+        # Test that the snapshot cannot be changed.
+        with self.assertRaises(TypeError) as cm:
+            self.manager.choice_relation_map[999] = 'Country'
+
+        with self.assertRaises(TypeError) as cm:
+            self.manager.css_container_map['andromeda_strain'] = 'andromeda'
+
+        with self.assertRaises(AttributeError) as cm:
+            self.manager.css_containers.append(
+                ('andromeda_strain', 'andromeda-strain'))
+
+        # Test that late registration raises an exception.
+        with self.assertRaises(RuntimeError) as cm:
+            self.manager.register_choice(Country, 99, 'name')
+
+        with self.assertRaises(RuntimeError) as cm:
+            self.manager.register_css_containers(
+                (('andromeda_strain', 'andromeda-strain'),))
+
     def test_choice_relations(self):
         """
         Test that the HTML select tag options are returned correctly. The
@@ -148,6 +190,25 @@ class TestManager(BaseDcolumns, TestCase):
         for rel in compare:
             self.assertTrue(rel in result.values(), msg)
 
+    def test_choice_relations_empty(self):
+        """
+        Test that no options are returned when no choices are registered.
+        """
+        #self.skipTest("Temporarily skipped")
+        self.manager._thaw()
+        self.addCleanup(self.manager.freeze)
+
+        with mock.patch.object(self.manager, '_relations', []):
+            result = self.manager.choice_relations
+            msg = "result: {}".format(result)
+            self.assertEqual(result, [], msg)
+            self.manager.freeze()
+            result = self.manager.choice_relations
+            msg = "result: {}".format(result)
+            self.assertEqual(result, [], msg)
+            self.assertEqual(self.manager.choice_relation_map, {}, msg)
+            self.manager._thaw()
+
     def test_choice_relation_map(self):
         """
         Test that a dict of choice relation names are returned keyed by an
@@ -197,6 +258,8 @@ class TestManager(BaseDcolumns, TestCase):
         """
         #self.skipTest("Temporarily skipped")
         css_cont = (('andromeda_strain', 'andromeda-strain'),)
+        self.manager._thaw()
+        self.addCleanup(self.manager.freeze)
         self.manager.register_css_containers(css_cont)
         msg = "New css_cont: {}, Original css_containers: {}".format(
             css_cont, self.manager._css_containers)
@@ -230,6 +293,8 @@ class TestManager(BaseDcolumns, TestCase):
         """
         #self.skipTest("Temporarily skipped")
         css_cont = (('andromeda_strain', 'andromeda-strain'),)
+        self.manager._thaw()
+        self.addCleanup(self.manager.freeze)
         self.manager.register_css_containers(css_cont)
         self.manager._unregester_css_containers(css_cont)
         msg = "New css_cont: {}, Original css_containers: {}".format(
@@ -249,24 +314,26 @@ class TestManager(BaseDcolumns, TestCase):
 
     def test_css_containers(self):
         """
-        Test that css_containers returns a list of tuples.
+        Test that css_containers returns a tuple of tuples.
         """
         #self.skipTest("Temporarily skipped")
         containers = self.manager.css_containers
         msg = "css_containers: {}".format(containers)
-        self.assertTrue(isinstance(containers, list), msg)
+        self.assertTrue(isinstance(containers, tuple), msg)
 
         for css in containers:
             self.assertTrue(isinstance(css, tuple), msg)
 
     def test_css_container_map(self):
         """
-        Test that css_container_map returns a dict.
+        Test that css_container_map returns a read only mapping.
         """
         #self.skipTest("Temporarily skipped")
         containers = self.manager.css_container_map
         msg = "css_container_map: {}".format(containers)
-        self.assertTrue(isinstance(containers, dict), msg)
+        self.assertTrue(isinstance(containers, MappingProxyType), msg)
+        self.assertEqual(dict(containers), dict(self.manager.css_containers),
+                         msg)
 
     def test_get_collection_name(self):
         """
@@ -316,6 +383,21 @@ class TestManager(BaseDcolumns, TestCase):
         msg = "state: {}".format(state)
         self.assertEqual(state, False, msg)
 
+    def test_cache_alias(self):
+        """
+        Test that the cache alias is returned properly.
+        """
+        #self.skipTest("Temporarily skipped")
+        alias = self.manager.cache_alias
+        msg = "alias: {}".format(alias)
+        self.assertEqual(alias, 'default', msg)
+
+        with override_settings(DYNAMIC_COLUMNS={'CACHE_ALIAS': 'shared'}):
+            alias = self.manager.cache_alias
+
+        msg = "alias: {}".format(alias)
+        self.assertEqual(alias, 'shared', msg)
+
     def test_get_related_object_names(self):
         """
         Test that the model list is returned.
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+#
+# dcolumn/dcolumns/tests/test_dcolumns_schema.py
+#
+# WARNING: These unittests can only be run from within the original test
+#          framework from https://github.com/cnobile2012/dcolumn.
+#
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import TestCase
+
+from example_site.books.choices import Language
+
+from ..models import DynamicColumn, ColumnCollection
+from ..schema import schema_cache, CollectionSchema
+
+from .base_tests import BaseDcolumns
+
+
+class TestSchemaCache(BaseDcolumns, TestCase):
+
+    def __init__(self, name):
+        super(TestSchemaCache, self).__init__(name)
+
+    def setUp(self):
+        super(TestSchemaCache, self).setUp()
+
+    def tearDown(self):
+        super(TestSchemaCache, self).tearDown()
+
+    def test_get_schema(self):
+        """
+        Test that the schema is compiled once and then cached.
+        """
+        #self.skipTest("Temporarily skipped")
+        book, b_cc, b_values = self._create_book_objects(
+            language=Language.objects.model_objects()[0])
+
+        with self.assertNumQueries(2):
+            schema = schema_cache.get_schema('Book')
+
+        with self.assertNumQueries(0):
+            schema = schema_cache.get_schema('book')
+            dc = book.get_dynamic_column('language')
+
+        slugs = [dc.slug for dc in schema.active_columns]
+        msg = "slugs: {}".format(slugs)
+        self.assertEqual(slugs, ['abstract', 'language'], msg)
+        self.assertEqual(schema.collection, b_cc, msg)
+        self.assertEqual(schema.by_slug.get('language'), dc, msg)
+        self.assertEqual(schema.by_pk.get(dc.pk), dc, msg)
+        self.assertTrue('language' in schema.relations, msg)
+        self.assertEqual(list(schema.locations), ['book_top'], msg)
+        # Test that a missing collection raises DoesNotExist.
+        with self.assertRaises(ColumnCollection.DoesNotExist) as cm:
+            schema_cache.get_schema('bad_name')
+
+    def test_invalidate(self):
+        """
+        Test that changes to the schema clear the cache.
+        """
+        #self.skipTest("Temporarily skipped")
+        book, b_cc, b_values = self._create_book_objects()
+        schema = schema_cache.get_schema('Book')
+        # Test a DynamicColumn change.
+        dc = schema.by_slug.get('abstract')
+        dc.name = 'Summary'
+        dc.save()
+        schema = schema_cache.get_schema('Book')
+        msg = "slugs: {}".format(list(schema.by_slug))
+        self.assertTrue('summary' in schema.by_slug, msg)
+        # Test a dynamic_column M2M change.
+        dc = self._create_dynamic_column_record(
+            "Edition", DynamicColumn.NUMBER, 'book_top', 4)
+        schema = schema_cache.get_schema('Book')
+        self.assertFalse('edition' in schema.by_slug, msg)
+        b_cc.dynamic_column.add(dc)
+        schema = schema_cache.get_schema('Book')
+        msg = "slugs: {}".format(list(schema.by_slug))
+        self.assertTrue('edition' in schema.by_slug, msg)
+        # Test a ColumnCollection change.
+        b_cc.active = False
+        b_cc.save()
+
+        with self.assertRaises(ColumnCollection.DoesNotExist) as cm:
+            schema_cache.get_schema('Book')
+
+    def test_clear_while_loading(self):
+        """
+        Test that a schema loaded before a clear is returned but not
+        stored.
+        """
+        #self.skipTest("Temporarily skipped")
+        book, b_cc, b_values = self._create_book_objects()
+
+        def compile_schema(*args):
+            schema_cache.clear()
+            return CollectionSchema(*args)
+
+        with mock.patch('dcolumn.dcolumns.schema.CollectionSchema',
+                        side_effect=compile_schema):
+            schema = schema_cache.get_schema('Book')
+
+        msg = "schema: {}".format(schema)
+        self.assertEqual(schema.collection, b_cc, msg)
+        self.assertFalse(b_cc.pk in schema_cache._by_pk, msg)
+        self.assertFalse('book' in schema_cache._by_name, msg)
+
+        with self.assertNumQueries(2):
+            schema_cache.get_schema('Book')
+
+        self.assertTrue(b_cc.pk in schema_cache._by_pk, msg)
+
+    def test_get_fk_slugs(self):
+        """
+        Test that the fk slugs are cached.
+        """
+        #self.skipTest("Temporarily skipped")
+        book, b_cc, b_values = self._create_book_objects(
+            language=Language.objects.model_objects()[0])
+        fk_slugs = DynamicColumn.objects.get_fk_slugs()
+
+        with self.assertNumQueries(0):
+            found = DynamicColumn.objects.get_fk_slugs()
+
+        msg = "found: {}, expected: {}".format(found, fk_slugs)
+        self.assertEqual(found, fk_slugs, msg)
+        self.assertEqual(found.get('Language'), 'language', msg)
+
+    def test_revalidate(self):
+        """
+        Test that a version bumped by another process clears the cache.
+        """
+        #self.skipTest("Temporarily skipped")
+        cache = caches['default']
+        cache.delete(schema_cache.VERSION_KEY)
+        # Test that a missing version is seeded.
+        schema_cache.revalidate()
+        version = schema_cache.version
+        msg = "version: {}, cached: {}".format(
+            version, cache.get(schema_cache.VERSION_KEY))
+        self.assertEqual(version, cache.get(schema_cache.VERSION_KEY), msg)
+        book, b_cc, b_values = self._create_book_objects()
+        # Test that a local change bumps the version.
+        msg = "version: {}, new version: {}".format(
+            version, schema_cache.version)
+        self.assertTrue(schema_cache.version > version, msg)
+        schema_cache.get_schema('Book')
+        version = schema_cache.version
+
+        with self.assertNumQueries(0):
+            schema_cache.revalidate()
+            schema_cache.get_schema('Book')
+
+        # Test a change made by another process.
+        cache.incr(schema_cache.VERSION_KEY)
+        schema_cache.revalidate()
+
+        with self.assertNumQueries(2):
+            schema_cache.get_schema('Book')
+
+        msg = "version: {}, new version: {}".format(
+            version, schema_cache.version)
+        self.assertEqual(schema_cache.version, version + 1, msg)
+        # Test that an evicted version is replaced by a larger one.
+        cache.delete(schema_cache.VERSION_KEY)
+        new_version = schema_cache.bump_version()
+        msg = "version: {}, new version: {}".format(version, new_version)
+        self.assertTrue(new_version > version, msg)
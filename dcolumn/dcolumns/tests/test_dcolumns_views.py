@@ -11,12 +11,17 @@ import pytz
 import dateutil
 import json
 
-from django.test import TestCase, Client
+from asgiref.sync import async_to_sync
+from django.test import TestCase, TransactionTestCase, Client, RequestFactory
+from django.contrib.auth.models import AnonymousUser
 from django.core.exceptions import ValidationError
 from django.urls import reverse
+from django.utils import timezone
 
-from dcolumn.dcolumns.views import CollectionAJAXView
+from dcolumn.dcolumns.views import (
+    CollectionAJAXView, async_collection_ajax_view)
 from dcolumn.dcolumns.models import DynamicColumn
+from dcolumn.dcolumns.choice_index import ChoiceIndex
 from example_site.books.choices import Language
 
 from .base_tests import BaseDcolumns
@@ -108,3 +113,221 @@ class TestCollectionAJAXView(BaseDcolumns, TestCase):
         self.assertTrue('dynamicColumns' in content, msg)
         self.assertTrue('relations' in content, msg)
         self.assertTrue('valid' in content, msg)
+
+
+    def test_conditional_get(self):
+        """
+        Test that the ETag changes with the choices and the schema and
+        that a matching If-None-Match gets a 304.
+        """
+        #self.skipTest("Temporarily skipped")
+        author, a_cc, a_values = self._create_author_objects()
+        book, b_cc, b_values = self._create_book_objects(
+            author=author, language=Language.objects.model_objects()[0])
+        url = reverse('dcolumns:api-collections',
+                      kwargs={'class_name': 'book'})
+        response = self.client.get(url)
+        etag = response.get('ETag')
+        msg = "ETag: {}".format(etag)
+        self.assertEqual(response.status_code, 200, msg)
+        self.assertTrue(etag, msg)
+        cache_control = response.get('Cache-Control', '')
+        msg = "Cache-Control: {}".format(cache_control)
+        self.assertTrue('private' in cache_control, msg)
+        self.assertTrue('must-revalidate' in cache_control, msg)
+        # Test that a matching ETag gets a 304 with no payload.
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        msg = "response status: {}, should be 304".format(
+            response.status_code)
+        self.assertEqual(response.status_code, 304, msg)
+        self.assertEqual(response.content, b'', msg)
+        self.assertEqual(response.get('ETag'), etag, msg)
+        # Test that a changed choice model changes the ETag.
+        self._create_dcolumn_record(author.__class__, a_cc, name='Tom Jones')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        msg = "response status: {}, should be 200".format(
+            response.status_code)
+        self.assertEqual(response.status_code, 200, msg)
+        self.assertNotEqual(response.get('ETag'), etag, msg)
+        # Test that a schema change changes the ETag.
+        etag = response.get('ETag')
+        self._create_dynamic_column_record(
+            "Edition", DynamicColumn.NUMBER, 'book_top', 8)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        msg = "response status: {}, should be 200".format(
+            response.status_code)
+        self.assertEqual(response.status_code, 200, msg)
+        self.assertNotEqual(response.get('ETag'), etag, msg)
+        # Test that the options are not older than the ETag when this
+        # process was not told about the change.
+        etag = response.get('ETag')
+        author.__class__.objects.filter(pk=author.pk).update(
+            name="Changed Name", updated=timezone.now())
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        content = json.loads(response.content.decode(encoding='utf-8'))
+        options = dict(content['dynamicColumns']['author'])
+        msg = "ETag: {}, options: {}".format(response.get('ETag'), options)
+        self.assertNotEqual(response.get('ETag'), etag, msg)
+        self.assertEqual(options.get(author.pk), "Changed Name", msg)
+
+class TestAsyncCollectionAJAXView(BaseDcolumns, TransactionTestCase):
+
+    def __init__(self, name):
+        super(TestAsyncCollectionAJAXView, self).__init__(name)
+
+    def _get(self, user=None, class_name='book', **headers):
+        url = reverse('dcolumns:api-async-collections',
+                      kwargs={'class_name': class_name})
+        request = RequestFactory().get(url, **headers)
+        request.user = user or self.user
+        return async_to_sync(async_collection_ajax_view)(
+            request, class_name=class_name)
+
+    def test_valid_response(self):
+        """
+        Test that the async view gives the same payload as the sync view.
+        """
+        #self.skipTest("Temporarily skipped")
+        author, a_cc, a_values = self._create_author_objects()
+        book, b_cc, b_values = self._create_book_objects(
+            author=author, language=Language.objects.model_objects()[0])
+        response = self._get()
+        msg = "response status: {}, should be 200".format(response.status_code)
+        self.assertEqual(response.status_code, 200, msg)
+        content = json.loads(response.content.decode(encoding='utf-8'))
+        client = Client()
+        client.login(username=self._TEST_USERNAME,
+                     password=self._TEST_PASSWORD)
+        expected = json.loads(client.get(reverse(
+            'dcolumns:api-collections',
+            kwargs={'class_name': 'book'})).content.decode(encoding='utf-8'))
+        msg = "content: {}, expected: {}".format(content, expected)
+        self.assertEqual(content, expected, msg)
+        self.assertTrue(content.get('valid'), msg)
+        # Test the URL of the async view.
+        content = json.loads(client.get(reverse(
+            'dcolumns:api-async-collections',
+            kwargs={'class_name': 'book'})).content.decode(encoding='utf-8'))
+        msg = "content: {}, expected: {}".format(content, expected)
+        self.assertEqual(content, expected, msg)
+        # Test the ETag.
+        etag = response.get('ETag')
+        response = self._get(HTTP_IF_NONE_MATCH=etag)
+        msg = "response status: {}, should be 304".format(
+            response.status_code)
+        self.assertEqual(response.status_code, 304, msg)
+        # Test an invalid collection.
+        response = self._get(class_name='bookX')
+        content = json.loads(response.content.decode(encoding='utf-8'))
+        msg = "content: {}".format(content)
+        self.assertFalse(content.get('valid'), msg)
+
+    def test_login_required(self):
+        """
+        Test that an anonymous user is redirected to the login page.
+        """
+        #self.skipTest("Temporarily skipped")
+        response = self._get(user=AnonymousUser())
+        msg = "response status: {}, should be 302".format(
+            response.status_code)
+        self.assertEqual(response.status_code, 302, msg)
+
+class TestCollectionChoicesAJAXView(BaseDcolumns, TestCase):
+    _TEST_USERNAME = 'TestUser'
+    _TEST_PASSWORD = 'TestPassword_007'
+
+    def __init__(self, name):
+        super(TestCollectionChoicesAJAXView, self).__init__(name)
+        self.client = None
+
+    def setUp(self):
+        super(TestCollectionChoicesAJAXView, self).setUp()
+        self.client = Client()
+        self.client.login(username=self._TEST_USERNAME,
+                          password=self._TEST_PASSWORD)
+
+    def _get(self, slug='author', class_name='book', **params):
+        url = reverse('dcolumns:api-choices',
+                      kwargs={'class_name': class_name, 'slug': slug})
+        response = self.client.get(url, params)
+        msg = "response status: {}, should be 200".format(
+            response.status_code)
+        self.assertEqual(response.status_code, 200, msg)
+        return json.loads(response.content.decode('utf-8'))
+
+    def test_choices(self):
+        """
+        Test that the options are searched and paged.
+        """
+        #self.skipTest("Temporarily skipped")
+        author, a_cc, a_values = self._create_author_objects()
+        names = ['Jeremy Blum', 'John Iovine', 'Joe Smith', 'Toby Segaran']
+
+        for name in names:
+            self._create_dcolumn_record(
+                author.__class__, a_cc, name=name)
+
+        book, b_cc, b_values = self._create_book_objects(
+            author=author, language=Language.objects.model_objects()[0])
+        # Test a prefix search, case is ignored.
+        data = self._get(q='jo')
+        found = [label for pk, label in data['results']]
+        msg = "data: {}".format(data)
+        self.assertTrue(data['valid'], msg)
+        self.assertEqual(found, ['Joe Smith', 'John Iovine'], msg)
+        self.assertEqual(data['next'], None, msg)
+        # Test paging with the cursor.
+        data = self._get(q='j', limit=2)
+        found = [label for pk, label in data['results']]
+        msg = "data: {}".format(data)
+        self.assertEqual(found, ['Jeremy Blum', 'Joe Smith'], msg)
+        data = self._get(q='j', limit=2, cursor=data['next'])
+        found = [label for pk, label in data['results']]
+        msg = "data: {}".format(data)
+        self.assertEqual(found, ['John Iovine'], msg)
+        self.assertEqual(data['next'], None, msg)
+        # Test that a limit of zero or less returns one option per page.
+        for limit in (0, -1):
+            data = self._get(q='j', limit=limit)
+            found = [label for pk, label in data['results']]
+            msg = "limit: {}, data: {}".format(limit, data)
+            self.assertEqual(found, ['Jeremy Blum'], msg)
+            self.assertNotEqual(data['next'], None, msg)
+
+        # Test a pseudo model choice.
+        data = self._get(slug='language', q='e')
+        found = [label for pk, label in data['results']]
+        msg = "data: {}".format(data)
+        self.assertEqual(found, ['English'], msg)
+        # Test that the index is cached.
+        with self.assertNumQueries(2): # Session and user.
+            self._get(q='t')
+
+        # Test that a new author is found.
+        self._create_dcolumn_record(author.__class__, a_cc, name='Tom Jones')
+        data = self._get(q='to')
+        found = [label for pk, label in data['results']]
+        msg = "data: {}".format(data)
+        self.assertEqual(found, ['Toby Segaran', 'Tom Jones'], msg)
+        # Test an invalid slug.
+        data = self._get(slug='abstract')
+        msg = "data: {}".format(data)
+        self.assertFalse(data['valid'], msg)
+        self.assertTrue('Invalid CHOICE slug' in data['message'], msg)
+
+    def test_search_limit(self):
+        """
+        Test that ChoiceIndex.search returns nothing and no cursor for a
+        limit less than one.
+        """
+        #self.skipTest("Temporarily skipped")
+        index = ChoiceIndex([(1, 'Jeremy Blum'), (2, 'John Iovine')])
+
+        for limit in (0, -1):
+            result = index.search('j', limit)
+            msg = "limit: {}, result: {}".format(limit, result)
+            self.assertEqual(result, ([], None), msg)
+
+        result = index.search('j', 1)
+        msg = "result: {}".format(result)
+        self.assertEqual(result, ([(1, 'Jeremy Blum')], 1), msg)
@@ -9,11 +9,17 @@ __docformat__ = "restructuredtext en"
 
 from django.urls import include, re_path, path
 
-from .views import collection_ajax_view
+from .views import (
+    collection_ajax_view, async_collection_ajax_view,
+    collection_choices_ajax_view)
 
 
 app_name = 'dcolumns'
 urlpatterns = [
     re_path(r'api/collections/(?P<class_name>\w+)/$', collection_ajax_view,
             name="api-collections"),
+    re_path(r'api/async/collections/(?P<class_name>\w+)/$',
+            async_collection_ajax_view, name="api-async-collections"),
+    re_path(r'api/collections/(?P<class_name>\w+)/choices/(?P<slug>[-\w]+)/$',
+            collection_choices_ajax_view, name="api-choices"),
     ]
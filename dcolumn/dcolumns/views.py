@@ -7,17 +7,31 @@ Dynamic Column dependent views.
 """
 __docformat__ = "restructuredtext en"
 
+import asyncio
+import hashlib
 import logging
+from functools import update_wrapper
 
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.db import connections
+from django.db.models import Model
 from django.db.transaction import atomic
 from django.forms import formset_factory
-from django.utils.decorators import method_decorator
+from django.http import JsonResponse
+from django.utils import translation
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers)
+from django.utils.decorators import classonlymethod, method_decorator
+from django.utils.http import quote_etag
 from django.views.generic import TemplateView
 
 from dcolumn.common.view_mixins import JSONResponseMixin
 from dcolumn.common.decorators import dcolumn_login_required
 from .models import DynamicColumn, ColumnCollection
 from .manager import dcolumn_manager
+from .schema import schema_cache
+from .choice_index import choice_index_cache
 
 log = logging.getLogger('dcolumns.dcolumns.views')
 
@@ -25,8 +39,13 @@ log = logging.getLogger('dcolumns.dcolumns.views')
 class ContextDataMixin(object):
     """
     Mixin for context data.
+
+    Set ``lazy_choices`` to ``True`` when the template uses
+    ``auto_display`` with ``autocomplete``, the options of the Django
+    model choices are then left out of the context.
     """
     formset_class = None
+    lazy_choices = False
 
     def get_dynamic_column_context_data(self, **kwargs):
         """
@@ -59,8 +78,38 @@ class ContextDataMixin(object):
         :rtype: dict
         """
         context = {}
+
+        for slug, model, field in self._get_choice_relations(**kwargs):
+            index = choice_index_cache.get_index(
+                model, field, self._get_choice_state(model, field))
+            self._add_choice_options(context, slug, index)
+
+        log.debug("context: %s", context)
+        return context
+
+    async def aget_dynamic_column_context_data(self, **kwargs):
+        """
+        The async version of ``get_dynamic_column_context_data``. The
+        option lists are loaded concurrently with ``asyncio.gather``, each
+        in its own thread and database connection.
+
+        :rtype: dict
+        """
+        relations = await sync_to_async(self._get_choice_relations)(**kwargs)
+        indexes = await asyncio.gather(*[self._aget_index(model, field)
+                                         for slug, model, field in relations])
+        context = {}
+
+        for (slug, model, field), index in zip(relations, indexes):
+            self._add_choice_options(context, slug, index)
+
+        log.debug("context: %s", context)
+        return context
+
+    def _get_choice_relations(self, **kwargs):
         fk_slugs = DynamicColumn.objects.get_fk_slugs()
         name = kwargs.pop('class_name', None) # Used in AJAX call only.
+        relations = []
 
         if not name:
             name = dcolumn_manager.get_collection_name(self.model.__name__)
@@ -68,16 +117,42 @@ class ContextDataMixin(object):
         for model_name in (ColumnCollection.objects.
                            get_active_relation_items(name)):
             model, field = dcolumn_manager.choice_map.get(model_name)
-            objects = context.setdefault('dynamicColumns', {})
-            values = [(r.pk, getattr(r, field))
-                      for r in model.objects.model_objects()]
-            values.insert(0, (0, "Choose a value"))
-            objects[fk_slugs.get(model_name)] = values
-            log.debug("model_name: %s, model: %s, field: %s, fk_slugs: %s, "
-                      "values: %s", model_name, model, field, fk_slugs, values)
 
-        log.debug("context: %s", context)
-        return context
+            if self.lazy_choices and issubclass(model, Model):
+                continue
+
+            relations.append((fk_slugs.get(model_name), model, field))
+            log.debug("model_name: %s, model: %s, field: %s, fk_slugs: %s",
+                      model_name, model, field, fk_slugs)
+
+        return relations
+
+    async def _aget_index(self, model, field):
+        # The loads are independent reads, so each one runs in a thread of
+        # its own with its own database connection and they overlap. With
+        # the default thread_sensitive=True they would run one at a time.
+        return await sync_to_async(self._load_index, thread_sensitive=False)(
+            model, field, self._get_choice_state(model, field))
+
+    def _load_index(self, model, field, state):
+        try:
+            return choice_index_cache.get_index(model, field, state)
+        finally:
+            # The connection belongs to the executor thread, not to the
+            # request, so it is not closed when the request finishes.
+            connections.close_all()
+
+    def _get_choice_state(self, model, field):
+        # The states the ETag was made from, if any, so the options are not
+        # older than the ETag.
+        return (getattr(self, 'choice_states', None) or {}).get(
+            (model, field))
+
+    def _add_choice_options(self, context, slug, index):
+        objects = context.setdefault('dynamicColumns', {})
+        values = list(index.options)
+        values.insert(0, (0, "Choose a value"))
+        objects[slug] = values
 
     def get_relation_context_data(self, obj=None, form=None, **kwargs):
         """
@@ -134,6 +209,21 @@ class ContextDataMixin(object):
         log.debug("relations: %s", relations)
         return {'relations': relations}
 
+    async def aget_relation_context_data(self, obj=None, form=None,
+                                         **kwargs):
+        """
+        The async version of ``get_relation_context_data``.
+
+        :param obj: Optional model object that inherits from
+                    ``CollectionBase``.
+        :type obj: object
+        :param form: Optional form object.
+        :type form: Django Form object.
+        :rtype: OrderedDict
+        """
+        return await sync_to_async(self.get_relation_context_data)(
+            obj=obj, form=form, **kwargs)
+
 
 #
 # CollectionAJAXView
@@ -142,8 +232,15 @@ class CollectionAJAXView(JSONResponseMixin, TemplateView, ContextDataMixin):
     """
     Web service endpoint used in the Django admin to format ``KeyValue``
     values as per the ``DynamicColumn`` meta data.
+
+    The response has an ETag built from the schema version and the state
+    of the choice models used by the collection, a request with a
+    matching ``If-None-Match`` header gets a 304 without the payload
+    being built. Set ``cache_max_age`` to let clients reuse the payload
+    without asking.
     """
     http_method_names = ('get',)
+    cache_max_age = 0
 
     @method_decorator(dcolumn_login_required)
     def dispatch(self, *args, **kwargs):
@@ -152,6 +249,76 @@ class CollectionAJAXView(JSONResponseMixin, TemplateView, ContextDataMixin):
         """
         return super(CollectionAJAXView, self).dispatch(*args, **kwargs)
 
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag(**kwargs)
+        response = get_conditional_response(request, etag=etag)
+
+        if response is None:
+            response = super(CollectionAJAXView, self).get(
+                request, *args, **kwargs)
+
+        return self.patch_cache_headers(response, etag)
+
+    def get_etag(self, class_name=None, **kwargs):
+        """
+        Get the ETag of the collection. It changes when the schema version,
+        the active language or the state of any of the Django model
+        choices used by the collection changes, see
+        ``ChoiceIndexCache.get_state``. The states are kept in
+        ``choice_states`` so the options in the payload are rebuilt if they
+        are older than the ETag.
+
+        :param class_name: The collection name.
+        :type class_name: str
+        :rtype: The quoted ETag or ``None`` if it could not be made.
+        """
+        self.choice_states = {}
+
+        try:
+            name = dcolumn_manager.get_collection_name(class_name)
+            parts = [class_name, str(schema_cache.get_version()),
+                     str(translation.get_language())]
+
+            for model_name in (ColumnCollection.objects.
+                               get_active_relation_items(name)):
+                model, field = dcolumn_manager.choice_map.get(model_name)
+                state = choice_index_cache.get_state(model, field)
+                self.choice_states[(model, field)] = state
+                parts.append("{}:{}".format(model_name, state))
+        except Exception as e:
+            log.warning("Could not make an ETag for %s, %s", class_name, e)
+            etag = None
+        else:
+            etag = quote_etag(hashlib.md5(
+                "|".join(parts).encode('utf-8')).hexdigest())
+
+        return etag
+
+    def patch_cache_headers(self, response, etag=None):
+        """
+        Add the ``ETag``, ``Cache-Control`` and ``Vary`` headers. The
+        response is ``private`` unless the API authorization is
+        inactivated.
+
+        :param response: The response of this view.
+        :type response: HttpResponse
+        :param etag: The quoted ETag or ``None``.
+        :type etag: str
+        :rtype: The response.
+        """
+        if etag:
+            response['ETag'] = etag
+
+        if dcolumn_manager.api_auth_state:
+            scope = {'public': True}
+        else:
+            scope = {'private': True}
+
+        patch_cache_control(response, max_age=self.cache_max_age,
+                            must_revalidate=True, **scope)
+        patch_vary_headers(response, ('Accept-Language', 'Cookie'))
+        return response
+
     def render_to_response(self, context, **response_kwargs):
         # Remove the view object--it cannot be serialized and we don't
         # need it.
@@ -181,6 +348,156 @@ class CollectionAJAXView(JSONResponseMixin, TemplateView, ContextDataMixin):
 collection_ajax_view = CollectionAJAXView.as_view()
 
 
+#
+# AsyncCollectionAJAXView
+#
+class AsyncCollectionAJAXView(CollectionAJAXView):
+    """
+    The async version of ``CollectionAJAXView`` for ASGI deployments. The
+    option lists of the choice models are loaded concurrently and the
+    request does not hold a worker thread while it waits for them.
+    """
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        """
+        Return a coroutine function so Django runs the view in the event
+        loop.
+        """
+        view = super(AsyncCollectionAJAXView, cls).as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        update_wrapper(async_view, view)
+        return async_view
+
+    async def dispatch(self, request, *args, **kwargs):
+        """
+        Django view dispatch. The ``login_required`` decorator cannot wrap
+        a coroutine so the user is checked here.
+        """
+        if not dcolumn_manager.api_auth_state:
+            authenticated = await sync_to_async(
+                lambda: request.user.is_authenticated)()
+
+            if not authenticated:
+                return redirect_to_login(request.get_full_path())
+
+        if request.method.lower() not in self.http_method_names:
+            return self.http_method_not_allowed(request, *args, **kwargs)
+
+        return await self.get(request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        etag = await sync_to_async(self.get_etag)(**kwargs)
+        response = get_conditional_response(request, etag=etag)
+
+        if response is None:
+            response = JsonResponse(await self.aget_data(**kwargs))
+
+        return self.patch_cache_headers(response, etag)
+
+    async def aget_data(self, **context):
+        """
+        The async version of ``get_data``.
+        """
+        log.debug("context: %s", context)
+        context['valid'] = True
+
+        try:
+            context.update(
+                await self.aget_dynamic_column_context_data(**context))
+            context.update(await self.aget_relation_context_data(**context))
+        except Exception as e:
+            context['valid'] = False
+            context['message'] = "Error occurred: {}".format(e)
+            log.error(context['message'], exc_info=True)
+
+        return context
+
+async_collection_ajax_view = AsyncCollectionAJAXView.as_view()
+
+
+#
+# CollectionChoicesAJAXView
+#
+class CollectionChoicesAJAXView(JSONResponseMixin, TemplateView):
+    """
+    Web service endpoint that searches the options of a ``CHOICE``
+    dynamic column by the start of their label. Used by the autocomplete
+    widgets rendered by ``auto_display``.
+
+    Query parameters::
+
+      q      -- The start of the label, case is ignored.
+      limit  -- The maximum number of options returned, default 20.
+      cursor -- The 'next' value of the previous response.
+    """
+    http_method_names = ('get',)
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 100
+
+    @method_decorator(dcolumn_login_required)
+    def dispatch(self, *args, **kwargs):
+        """
+        Django view dispatch decorated for login requierments.
+        """
+        return super(CollectionChoicesAJAXView, self).dispatch(
+            *args, **kwargs)
+
+    def render_to_response(self, context, **response_kwargs):
+        context.pop('view', None)
+        return self.render_to_json_response(context, **response_kwargs)
+
+    def get_data(self, **context):
+        """
+        Get the options matching the query.
+        """
+        log.debug("context: %s", context)
+        context['valid'] = True
+
+        try:
+            context.update(self.get_choices(**context))
+        except Exception as e:
+            context['valid'] = False
+            context['message'] = "Error occurred: {}".format(e)
+            log.error(context['message'], exc_info=True)
+
+        return context
+
+    def get_choices(self, class_name, slug, **kwargs):
+        """
+        Find the options for the slug in the collection.
+
+        :param class_name: The collection name.
+        :type class_name: str
+        :param slug: The slug of a ``CHOICE`` dynamic column.
+        :type slug: str
+        :rtype: dict
+        :raises ValueError: If the slug is not a ``CHOICE`` column or the
+                            query parameters are invalid.
+        """
+        schema = schema_cache.get_schema(
+            dcolumn_manager.get_collection_name(class_name))
+        dc = schema.by_slug.get(slug)
+
+        if not dc or not dc.active or dc.value_type != dc.CHOICE:
+            raise ValueError("Invalid CHOICE slug '{}'.".format(slug))
+
+        model, field = dc.get_choice_relation_object_and_field()
+        index = choice_index_cache.get_index(model, field)
+        params = self.request.GET
+        limit = max(1, min(int(params.get('limit', self.DEFAULT_LIMIT)),
+                           self.MAX_LIMIT))
+        cursor = params.get('cursor')
+        cursor = int(cursor) if cursor else None
+        results, cursor = index.search(params.get('q', ''), limit, cursor)
+        return {'results': results, 'next': cursor}
+
+collection_choices_ajax_view = CollectionChoicesAJAXView.as_view()
+
+
 #
 # CollectionCreateUpdateViewMixin
 #
@@ -99,6 +99,21 @@ class BookListView(LoginRequiredMixin,
     template_name = 'books/book_list_view.html'
     model = Book
     paginate_by = 50
+    queryset = Book.objects.with_key_values()
+
+    def get_queryset(self):
+        """
+        Sort on a dynamic column if its slug is in the 'sort' parameter,
+        a leading '-' sorts in descending order.
+        """
+        queryset = super(BookListView, self).get_queryset()
+        sort = self.request.GET.get('sort', '')
+        slug = sort.lstrip('-')
+
+        if slug and slug in Book.objects.get_all_slugs():
+            queryset = queryset.annotate_kv(slug).order_by(sort, 'title')
+
+        return queryset
 
 book_list_view = BookListView.as_view()
 
@@ -183,6 +198,7 @@ class PublisherListView(LoginRequiredMixin,
     template_name = 'books/publisher_list_view.html'
     model = Publisher
     paginate_by = 50
+    queryset = Publisher.objects.with_key_values()
 
 publisher_list_view = PublisherListView.as_view()
 
@@ -267,6 +283,7 @@ class AuthorListView(LoginRequiredMixin,
     template_name = 'books/author_list_view.html'
     model = Author
     paginate_by = 50
+    queryset = Author.objects.with_key_values()
 
 author_list_view = AuthorListView.as_view()
 
@@ -352,5 +369,6 @@ class PromotionListView(LoginRequiredMixin,
     template_name = 'books/promotion_list_view.html'
     model = Promotion
     paginate_by = 50
+    queryset = Promotion.objects.with_key_values()
 
 promotion_list_view = PromotionListView.as_view()
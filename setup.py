@@ -25,7 +25,8 @@ setup(
     name='django-dcolumns',
     version=version(),
     packages=['dcolumn', 'dcolumn.dcolumns', 'dcolumn.dcolumns.migrations',
-              'dcolumn.common',],
+              'dcolumn.dcolumns.management',
+              'dcolumn.dcolumns.management.commands', 'dcolumn.common',],
     include_package_data=True,
     license='MIT',
     description=('An app to give any Django database model the ability to '
@@ -43,8 +44,6 @@ setup(
         'Operating System :: OS Independent',
         'Programming Language :: Python',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         'Topic :: Software Development :: Build Tools',
         'Topic :: Internet :: WWW/HTTP',
@@ -52,6 +51,7 @@ setup(
         ],
     keywords='Django DColumns',
     project_urls={'Source': 'https://github.com/cnobile2012/dcolumn'},
+    python_requires='>=3.7',
     install_requires=[
         'django',
         'dateutils',